@@ -0,0 +1,122 @@
+"""Compare GET /people/ serialization: per-row PersonOut models vs. the
+tuple-to-JSON fast path.
+
+    python -m benchmarks.list_people_serialization
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SCOUTING_DB_PATH", str(Path(tempfile.mkdtemp()) / "bench.db"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from server.database import get_connection  # noqa: E402
+from server.main import _person_from_row, app  # noqa: E402
+from server.serialization import (  # noqa: E402
+    PERSON_COLUMNS,
+    dumps,
+    people_from_tuples,
+)
+
+LIMITS = (100, 1000, 10000)
+REPEAT = 20
+
+
+def seed(count: int):
+    conn = get_connection()
+    if conn.execute("SELECT COUNT(*) FROM people").fetchone()[0] >= count:
+        conn.close()
+        return
+    conn.execute("INSERT OR IGNORE INTO countries (name, code) VALUES ('Canada', 'CA')")
+    conn.execute(
+        "INSERT OR IGNORE INTO universities (name, ror_id) "
+        "VALUES ('University of Toronto', 'https://ror.org/03dbr7087')"
+    )
+    conn.executemany(
+        """
+        INSERT INTO people (
+            name, email, university_id, country_id,
+            subfield, subfield_name, role, notes
+        ) VALUES (?, ?, 1, 1, 'Department', 'Physics', 'Professor', ?)
+        """,
+        ((f"Person {i}", f"person{i}@example.com", f"Note {i}") for i in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def fetch(limit: int, tuples: bool):
+    conn = get_connection()
+    cursor = conn.cursor()
+    if tuples:
+        cursor.row_factory = None
+        cursor.execute(
+            f"""
+            SELECT {PERSON_COLUMNS}
+            FROM people p
+            JOIN universities u ON p.university_id = u.id
+            JOIN countries c ON p.country_id = c.id
+            ORDER BY p.id DESC LIMIT ?
+            """,
+            (limit,),
+        )
+    else:
+        cursor.execute(
+            """
+            SELECT p.*, u.name AS university, c.name AS country
+            FROM people p
+            JOIN universities u ON p.university_id = u.id
+            JOIN countries c ON p.country_id = c.id
+            ORDER BY p.id DESC LIMIT ?
+            """,
+            (limit,),
+        )
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def model_path(limit: int) -> bytes:
+    """Previous behaviour: PersonOut per row, then response_model re-encoding."""
+    people = [_person_from_row(row) for row in fetch(limit, tuples=False)]
+    return dumps(jsonable_encoder(people))
+
+
+def fast_path(limit: int) -> bytes:
+    return dumps(people_from_tuples(fetch(limit, tuples=True)))
+
+
+def best_of(fn, limit: int) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(limit)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    seed(max(LIMITS))
+    assert model_path(100) == fast_path(100), "fast path output differs"
+
+    client = TestClient(app)
+    print(
+        f"{'limit':>6} {'models ms':>10} {'fast ms':>9} {'speedup':>8} {'endpoint ms':>12}"
+    )
+    for limit in LIMITS:
+        slow = best_of(model_path, limit)
+        fast = best_of(fast_path, limit)
+        endpoint = best_of(
+            lambda n: client.get("/people/", params={"limit": n}).content, limit
+        )
+        print(
+            f"{limit:>6} {slow:>10.2f} {fast:>9.2f} {slow / fast:>7.1f}x {endpoint:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
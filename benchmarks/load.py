@@ -0,0 +1,414 @@
+"""Load-test a running server with many concurrent simulated clients.
+
+    python -m benchmarks.load --url http://127.0.0.1:8000 --users 50 --duration 60
+    python -m benchmarks.load --serve --people 20000 --users 100 --output load.json
+    python -m benchmarks.load --replay traffic.jsonl --users 20
+
+Simulated users behave like ClientApp: a ping every 100 ms, a change-feed
+sync every 5 s, debounced searches while typing, and occasional creates,
+edits and CSV exports. Each user syncs before its first search, after which
+ClientApp answers searches from its local replica; the default
+``--profile replica`` therefore sends none to the server. ``--profile online``
+sends every search to ``/people/``, as a client whose replica is not yet
+synced (or bound to another server) does.
+
+``--replay`` sends the requests of a recorded log instead, one JSON object
+per line: ``{"method": "GET", "path": "/people/", "params": {...},
+"json": {...}, "t": 1.25}``. ``t`` (seconds from the start) is honoured
+with ``--replay-timing``; lines without ``method`` and ``path`` are skipped.
+
+``--serve`` starts uvicorn on a synthetic catalog (see synthetic.py) first,
+with ``SCOUTING_ROR_SOURCE`` cleared so it does not load ROR data meanwhile.
+Requires httpx (``pip install .[bench]``).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+from .run import percentile
+from .synthetic import FIELDS, ROLES, SUBFIELDS, prepare_database
+
+# ClientApp timings (client/main.py).
+PING_INTERVAL = 0.1
+SYNC_INTERVAL = 5.0
+SEARCH_DEBOUNCE = 0.2
+PAGE_SIZE = 100
+
+# Relative weights of what a user does between pauses.
+ACTIONS = {"search": 90, "edit": 5, "create": 3, "export": 1, "facets": 1}
+
+# PATCH /people/{id} takes the whole PersonCreate.
+EDIT_FIELDS = (
+    "name",
+    "email",
+    "university",
+    "country",
+    "subfield",
+    "subfield_name",
+    "role",
+    "notes",
+)
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+class Stats:
+    """Latencies and failures per request label (method + path template)."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.server_errors = {}
+        self.client_errors = {}
+        self.failures = {}
+
+    async def timed(self, client, method, path, **kwargs):
+        label = f"{method} {_ID_RE.sub('/{id}', path)}"
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.failures[label] = self.failures.get(label, 0) + 1
+            return None
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            self.server_errors[label] = self.server_errors.get(label, 0) + 1
+        elif response.status_code >= 400:
+            self.client_errors[label] = self.client_errors.get(label, 0) + 1
+        return response
+
+    def report(self, wall: float) -> dict:
+        def summary(values, server_errors, client_errors, failures):
+            ms = sorted(v * 1000 for v in values)
+            total = len(ms) + failures
+            return {
+                "requests": total,
+                "throughput_rps": round(total / wall, 1) if wall else 0.0,
+                "error_rate": round((server_errors + failures) / total, 4)
+                if total
+                else 0.0,
+                "server_errors": server_errors,
+                "client_errors": client_errors,
+                "failures": failures,
+                "p50_ms": round(percentile(ms, 0.50), 3),
+                "p95_ms": round(percentile(ms, 0.95), 3),
+                "p99_ms": round(percentile(ms, 0.99), 3),
+                "max_ms": round(ms[-1], 3) if ms else 0.0,
+            }
+
+        labels = sorted(set(self.latencies) | set(self.failures))
+        routes = {
+            label: summary(
+                self.latencies.get(label, []),
+                self.server_errors.get(label, 0),
+                self.client_errors.get(label, 0),
+                self.failures.get(label, 0),
+            )
+            for label in labels
+        }
+        overall = summary(
+            [v for values in self.latencies.values() for v in values],
+            sum(self.server_errors.values()),
+            sum(self.client_errors.values()),
+            sum(self.failures.values()),
+        )
+        return {"duration_s": round(wall, 2), "overall": overall, "routes": routes}
+
+
+async def _until(deadline: float, interval: float, request):
+    while time.monotonic() < deadline:
+        await request()
+        await asyncio.sleep(interval)
+
+
+async def simulated_user(
+    n, base_url, stats, deadline, rng, profile, ping_interval, think_time
+):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        await stats.timed(client, "GET", "/ping")
+        await stats.timed(client, "GET", "/universities/")
+        countries = await stats.timed(client, "GET", "/countries/")
+        first_page = await stats.timed(
+            client,
+            "GET",
+            "/people/",
+            params={"limit": PAGE_SIZE, "format": "columns"},
+        )
+        if countries is None or first_page is None or first_page.is_error:
+            return
+        country_names = [c["name"] for c in countries.json()] or ["Canada"]
+        page = first_page.json()
+        people = [dict(zip(page["columns"], row)) for row in page["rows"]]
+        terms = [p["name"] for p in people] + [p["university"] for p in people]
+        terms = terms or FIELDS
+
+        version = 0
+
+        async def sync():
+            nonlocal version
+            while True:
+                response = await stats.timed(
+                    client,
+                    "GET",
+                    "/people/changes",
+                    params={"since": version, "limit": 1000},
+                )
+                if response is None or response.is_error:
+                    return
+                body = response.json()
+                version = body["version"]
+                if not body["has_more"]:
+                    return
+
+        async def ping():
+            await stats.timed(client, "GET", "/ping")
+
+        await sync()  # Builds the local replica, as ClientApp does.
+        background = [
+            asyncio.create_task(_until(deadline, ping_interval, ping)),
+            asyncio.create_task(_until(deadline, SYNC_INTERVAL, sync)),
+        ]
+
+        async def search(text):
+            if profile == "online":
+                await stats.timed(
+                    client,
+                    "GET",
+                    "/people/",
+                    params={"q": text, "limit": PAGE_SIZE, "format": "columns"},
+                )
+
+        created = 0
+        names, weights = zip(*ACTIONS.items())
+        while time.monotonic() < deadline:
+            action = rng.choices(names, weights)[0]
+            if action in ("create", "edit") and not people:
+                action = "search"
+            if action == "search":
+                term = rng.choice(terms)
+                typed = term[: rng.randint(min(3, len(term)), len(term))]
+                for i in range(1, len(typed) + 1):
+                    delay = rng.uniform(0.05, 0.3)
+                    if delay >= SEARCH_DEBOUNCE and i > 1:
+                        await asyncio.sleep(SEARCH_DEBOUNCE)
+                        await search(typed[: i - 1])
+                        delay -= SEARCH_DEBOUNCE
+                    await asyncio.sleep(delay)
+                await asyncio.sleep(SEARCH_DEBOUNCE)
+                await search(typed)
+            elif action == "create":
+                created += 1
+                await stats.timed(
+                    client,
+                    "POST",
+                    "/people/",
+                    json={
+                        "name": f"Load User {n}-{created}",
+                        "email": f"load.{n}.{created}.{rng.getrandbits(32)}@example.org",
+                        "university": rng.choice(people)["university"],
+                        "country": rng.choice(country_names),
+                        "subfield": rng.choice(SUBFIELDS),
+                        "subfield_name": rng.choice(FIELDS),
+                        "role": rng.choice(ROLES),
+                        "notes": "Created by the load test",
+                    },
+                )
+            elif action == "edit":
+                person = rng.choice(people)
+                data = {key: person[key] for key in EDIT_FIELDS}
+                data["notes"] = f"Edited by load user {n} at {time.time():.0f}"
+                await stats.timed(client, "PATCH", f"/people/{person['id']}", json=data)
+            elif action == "export":
+                await stats.timed(client, "GET", "/people/export_csv")
+            else:
+                await stats.timed(
+                    client, "GET", "/people/facets", params={"role": rng.choice(ROLES)}
+                )
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+
+def read_replay_log(path) -> tuple[list[dict], int]:
+    entries, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if not isinstance(entry, dict) or not {"method", "path"} <= entry.keys():
+                skipped += 1
+                continue
+            entries.append(entry)
+    return entries, skipped
+
+
+async def replay_worker(base_url, stats, queue, started, timing, speed):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        while True:
+            try:
+                entry = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if timing and "t" in entry:
+                delay = started + entry["t"] / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await stats.timed(
+                client,
+                entry["method"].upper(),
+                entry["path"],
+                params=entry.get("params"),
+                json=entry.get("json"),
+            )
+
+
+async def run_load(args) -> dict:
+    stats = Stats()
+    started = time.monotonic()
+    if args.replay:
+        entries, skipped = read_replay_log(args.replay)
+        if skipped:
+            print(f"Skipped {skipped} line(s) of {args.replay} that are not requests.")
+        if not entries:
+            return {"error": f"No replayable requests in {args.replay}"}
+        queue = asyncio.Queue()
+        for entry in entries:
+            queue.put_nowait(entry)
+        await asyncio.gather(
+            *(
+                replay_worker(
+                    args.url, stats, queue, started, args.replay_timing, args.speed
+                )
+                for _ in range(args.users)
+            )
+        )
+    else:
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                simulated_user(
+                    n,
+                    args.url,
+                    stats,
+                    deadline,
+                    random.Random(args.seed * 100003 + n),
+                    args.profile,
+                    args.ping_interval,
+                    args.think_time,
+                )
+                for n in range(args.users)
+            )
+        )
+    return stats.report(time.monotonic() - started)
+
+
+def start_server(args) -> subprocess.Popen:
+    """Run uvicorn on a synthetic catalog and wait for /ping."""
+    prepare_database(args.universities, args.people, args.emails, args.seed)
+    url = urlparse(args.url)
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "server.main:app",
+            "--host",
+            url.hostname or "127.0.0.1",
+            "--port",
+            str(url.port or 8000),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "SCOUTING_ROR_SOURCE": ""},
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(args.url + "/ping", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("Server did not start.")
+
+
+def print_report(report: dict):
+    print(
+        f"{'route':<36} {'reqs':>7} {'req/s':>7} {'err %':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = list(report["routes"].items()) + [("TOTAL", report["overall"])]
+    for label, s in rows:
+        print(
+            f"{label:<36} {s['requests']:>7} {s['throughput_rps']:>7.1f} "
+            f"{s['error_rate'] * 100:>6.2f} {s['p50_ms']:>8.2f} "
+            f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--profile", choices=("replica", "online"), default="replica")
+    parser.add_argument("--ping-interval", type=float, default=PING_INTERVAL)
+    parser.add_argument(
+        "--think-time", type=float, default=3.0, help="Mean pause between actions (s)."
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay", help="JSON-lines request log to replay.")
+    parser.add_argument("--replay-timing", action="store_true")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--universities", type=int, default=500)
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+    args.url = args.url.rstrip("/")
+
+    server = start_server(args) if args.serve else None
+    try:
+        report = asyncio.run(run_load(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if "error" in report:
+        print(report["error"])
+        return 1
+    report["settings"] = {
+        key: getattr(args, key)
+        for key in ("url", "users", "duration", "profile", "ping_interval", "replay")
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
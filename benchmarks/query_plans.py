@@ -0,0 +1,186 @@
+"""Check the query plans of the server's hot queries.
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --people 50000 --verbose
+
+Runs EXPLAIN QUERY PLAN for the statements in server/queries.py against a
+synthetic catalog (see benchmarks/synthetic.py) and exits non-zero when a
+plan scans a table that should be searched through an index, sorts in a
+temporary b-tree, or stops using an expected index. Each case is checked
+before and after ANALYZE, since statistics can change the planner's mind.
+"""
+
+import argparse
+import re
+import sys
+
+from .synthetic import prepare_database
+
+_SCAN_RE = re.compile(r"^\s*SCAN (?!CONSTANT ROW)(\w+)")
+
+# Cases that may sort in a temporary b-tree: facet counts are ordered by
+# count and search hits by bm25 rank, neither of which an index can hold.
+SORTING_CASES = {"people_facets", "people_facets_role", "search_emails"}
+
+
+def cases() -> dict:
+    """Name -> (sql, params, tables allowed to be scanned, indexes to use)."""
+    from server import queries
+    from server.export import EXPORT_TABLES, batch_query
+    from server.serialization import PERSON_KEYS
+
+    def people(role=None, country=None, subfield=None, q=None, keys=PERSON_KEYS):
+        return queries.list_people(keys, role, country, subfield, q, 100, 0)
+
+    return {
+        "university_by_name": (
+            queries.UNIVERSITY_BY_NAME,
+            ["University of Toronto"],
+            (),
+            (),
+        ),
+        "university_by_alias": (queries.UNIVERSITY_BY_ALIAS, ["U of T"], (), ()),
+        "university_by_ror_id": (
+            queries.UNIVERSITY_BY_ROR_ID,
+            ["https://ror.org/bench000001"],
+            (),
+            (),
+        ),
+        "country_by_name": (queries.COUNTRY_BY_NAME, ["Canada"], (), ()),
+        "country_by_code": (queries.COUNTRY_BY_CODE, ["CA"], (), ()),
+        "person_by_email": (queries.PERSON_BY_EMAIL, ["a@example.org"], (), ()),
+        # Newest-first pages walk the rowid backwards and stop at the limit.
+        "list_people": (*people(), ("p",), ()),
+        "list_people_ids": (*people(keys=("id", "name")), ("p",), ()),
+        "list_people_role": (*people(role="Professor"), (), ("idx_people_role",)),
+        "list_people_subfield": (
+            *people(subfield="Department"),
+            (),
+            ("idx_people_subfield",),
+        ),
+        "list_people_country": (
+            *people(country="Canada"),
+            (),
+            ("idx_people_country",),
+        ),
+        # Substring matches cannot use an index.
+        "list_people_search": (*people(q="phys"), ("p",), ()),
+        "person_emails": (
+            *queries.person_emails(1, 51, None, False),
+            (),
+            ("idx_email_logs_person_time",),
+        ),
+        "person_emails_next_page": (
+            *queries.person_emails(1, 51, 100, True),
+            (),
+            ("idx_email_logs_person_time",),
+        ),
+        "export_people": (queries.EXPORT_PEOPLE, [], ("p",), ()),
+        "max_person_id": (queries.MAX_PERSON_ID, [], (), ()),
+        "count_people": (
+            *queries.count_people(None, None, None, None),
+            ("people",),
+            (),
+        ),
+        "count_people_role": (
+            *queries.count_people("Professor", None, None, None),
+            (),
+            ("idx_people_role",),
+        ),
+        # Substring searches and facets read every person; with statistics
+        # the planner may drive them from the small joined tables instead.
+        "count_people_search": (
+            *queries.count_people(None, None, None, "tremb"),
+            ("p", "u", "c"),
+            (),
+        ),
+        # The sampled ids are looked up one by one, never scanned.
+        "sample_people": (
+            *queries.sample_people(None, None, None, "tremb", 10, 5000),
+            ("sample",),
+            (),
+        ),
+        "people_facets": (
+            *queries.people_facets(None, None, None, None, 50),
+            ("p", "u", "c"),
+            (),
+        ),
+        "people_facets_role": (
+            *queries.people_facets("Professor", None, None, None, 50),
+            ("p", "u", "c"),
+            ("idx_people_role",),
+        ),
+        "search_emails": (
+            *queries.search_emails('"quantum"', 20),
+            ("email_fts", "h"),
+            (),
+        ),
+        "email_texts": (*queries.email_texts([1, 2, 3]), (), ()),
+        # Export batches continue from the last id through the primary key.
+        **{
+            f"export_{table}_batch": (batch_query(table), [100, 1000], (), ())
+            for table in EXPORT_TABLES
+        },
+    }
+
+
+def check_plan(plan: list[str], scans, indexes, sorts=False) -> list[str]:
+    """Problems with an EXPLAIN QUERY PLAN, as readable sentences."""
+    problems = []
+    for line in plan:
+        match = _SCAN_RE.match(line)
+        if match and match.group(1) not in scans:
+            problems.append(f"full scan: {line.strip()}")
+        if "USE TEMP B-TREE" in line and not sorts:
+            problems.append(f"sorts without an index: {line.strip()}")
+    for index in indexes:
+        if not any(f" {index} " in f"{line} " for line in plan):
+            problems.append(f"does not use {index}")
+    if not plan:
+        problems.append("could not be explained")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universities", type=int, default=200)
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--emails", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan.")
+    args = parser.parse_args(argv)
+
+    # Sets SCOUTING_DB_PATH, so it has to come before importing the server.
+    prepare_database(args.universities, args.people, args.emails, args.seed)
+
+    from server.database import get_connection
+    from server.slow_queries import explain
+
+    conn = get_connection()
+    failures = 0
+    try:
+        for stats in ("without statistics", "after ANALYZE"):
+            if stats == "after ANALYZE":
+                conn.execute("ANALYZE")
+            print(f"Query plans {stats}:")
+            for name, (sql, params, scans, indexes) in cases().items():
+                plan = explain(conn, sql, params)
+                problems = check_plan(plan, scans, indexes, name in SORTING_CASES)
+                failures += bool(problems)
+                print(f"  {'FAIL' if problems else 'ok':<5}{name}")
+                for problem in problems:
+                    print(f"         {problem}")
+                if args.verbose or problems:
+                    print("\n".join(f"         | {line}" for line in plan))
+    finally:
+        conn.close()
+
+    if failures:
+        print(f"\n{failures} plan check(s) failed.")
+        return 1
+    print("\nAll plans use their indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Benchmark the key server endpoints in-process on a synthetic catalog.
+
+    python -m benchmarks.run --people 20000 --emails 50000 --output base.json
+    python -m benchmarks.run --people 20000 --emails 50000 --compare base.json
+
+Every scenario runs through FastAPI's TestClient against the same
+reproducible database (see benchmarks/synthetic.py) and reports latency
+percentiles and throughput. ``--output`` writes the results as JSON;
+``--compare`` prints the change against an earlier results file.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from .synthetic import (
+    FIRST_NAMES,
+    LAST_NAMES,
+    ROLES,
+    VOCABULARY,
+    WORDS,
+    prepare_database,
+)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(latencies: list[float], wall: float) -> dict:
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "requests": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(percentile(ms, 0.50), 3),
+        "p90_ms": round(percentile(ms, 0.90), 3),
+        "p99_ms": round(percentile(ms, 0.99), 3),
+        "max_ms": round(ms[-1], 3),
+        "throughput_rps": round(len(ms) / wall, 1) if wall else 0.0,
+    }
+
+
+def scenarios(rng: random.Random, emails_by_id: dict[int, str]) -> dict:
+    """Name -> function issuing one request with a TestClient.
+
+    Request parameters are drawn from ``rng`` so runs are repeatable.
+    """
+    person_ids = sorted(emails_by_id)
+    threads = iter(range(10**9))
+
+    def people_query():
+        # What users type: part of a last name, a first name, the start of
+        # a full name or of an email address.
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return rng.choice(
+            [
+                last[:5],
+                first,
+                f"{first} {last}"[: len(first) + 3],
+                f"{first}.{last}".lower()[: len(first) + 2],
+            ]
+        )
+
+    def email_thread(client):
+        ids = rng.sample(person_ids, min(3, len(person_ids)))
+        n = next(threads)
+        return client.post(
+            "/emails/",
+            json={
+                "timestamp": "2026-06-01T12:00:00",
+                "subject": f"Benchmark thread {n}",
+                "body": " ".join(rng.choice(WORDS) for _ in range(200)),
+                "thread_id": f"bench-run-{n}",
+                "participants": [emails_by_id[i] for i in ids],
+            },
+        )
+
+    return {
+        "list_people": lambda c: c.get("/people/", params={"limit": 100}),
+        "list_people_role": lambda c: c.get(
+            "/people/", params={"role": rng.choice(ROLES), "limit": 100}
+        ),
+        "list_people_search": lambda c: c.get(
+            "/people/", params={"q": people_query(), "limit": 100}
+        ),
+        "list_people_columns_count": lambda c: c.get(
+            "/people/",
+            params={"limit": 100, "format": "columns", "count": "estimate"},
+        ),
+        "people_facets": lambda c: c.get(
+            "/people/facets", params={"role": rng.choice(ROLES)}
+        ),
+        "person_emails": lambda c: c.get(
+            f"/people/{rng.choice(person_ids)}/emails/", params={"limit": 50}
+        ),
+        "email_search": lambda c: c.get(
+            "/emails/search",
+            params={"q": f"{rng.choice(WORDS)} {rng.choice(VOCABULARY[:200])}"},
+        ),
+        "university_suggest": lambda c: c.get(
+            "/universities/suggest", params={"q": rng.choice(["uni", "tor", "pol"])}
+        ),
+        "export_people_csv": lambda c: c.get("/people/export_csv"),
+        "ingest_email_thread": email_thread,
+    }
+
+
+def run_scenario(client, request, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        request(client).raise_for_status()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = request(client)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    print(f"\n{'scenario':<28} {'p50 base':>9} {'p50 now':>9} {'change':>8}")
+    for name, now in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            print(f"{name:<28} {'-':>9} {now['p50_ms']:>9.2f} {'new':>8}")
+            continue
+        change = (now["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0
+        print(
+            f"{name:<28} {base['p50_ms']:>9.2f} {now['p50_ms']:>9.2f} {change:>+7.1f}%"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universities", type=int, default=500)
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--only", action="append", help="Run just this scenario (repeatable)."
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Earlier results JSON to compare with.")
+    args = parser.parse_args(argv)
+
+    # Sets SCOUTING_DB_PATH, so it has to come before importing the app.
+    path = prepare_database(args.universities, args.people, args.emails, args.seed)
+
+    from fastapi.testclient import TestClient
+
+    from server.database import get_connection
+    from server.main import app
+
+    conn = get_connection()
+    emails_by_id = dict(conn.execute("SELECT id, email FROM people").fetchall())
+    conn.close()
+
+    client = TestClient(app)
+    rng = random.Random(args.seed)
+    selected = scenarios(rng, emails_by_id)
+    if args.only:
+        unknown = set(args.only) - set(selected)
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+        selected = {name: selected[name] for name in args.only}
+
+    results = {
+        "started_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "database": {
+            "path": str(path),
+            "universities": args.universities,
+            "people": args.people,
+            "emails": args.emails,
+            "seed": args.seed,
+        },
+        "iterations": args.iterations,
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<28} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for name, request in selected.items():
+        # Export is a full-table job; fewer runs keep the suite quick.
+        iterations = (
+            max(1, args.iterations // 20) if "export" in name else args.iterations
+        )
+        stats = run_scenario(client, request, iterations, min(args.warmup, iterations))
+        results["scenarios"][name] = stats
+        print(
+            f"{name:<28} {stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f} "
+            f"{stats['p99_ms']:>8.2f} {stats['throughput_rps']:>8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
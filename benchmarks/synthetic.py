@@ -0,0 +1,234 @@
+"""Reproducible synthetic catalogs for benchmarks.
+
+The same counts and seed always produce the same database, so timings from
+different commits compare like with like. Databases are cached next to a
+small JSON description and reused when the parameters match.
+
+``populate`` expects a connection from ``server.database.get_connection``
+on an initialized database. ``prepare_database`` handles creation and
+caching, but must run before anything imports ``server``.
+"""
+
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+
+COUNTRIES = [
+    ("Canada", "CA"),
+    ("United States", "US"),
+    ("United Kingdom", "GB"),
+    ("France", "FR"),
+    ("Germany", "DE"),
+    ("Switzerland", "CH"),
+    ("Netherlands", "NL"),
+    ("Sweden", "SE"),
+    ("Japan", "JP"),
+    ("South Korea", "KR"),
+    ("Australia", "AU"),
+    ("Israel", "IL"),
+    ("Singapore", "SG"),
+    ("Brazil", "BR"),
+    ("India", "IN"),
+    ("Spain", "ES"),
+]
+ROLES = ["Department Head", "TTO Officer", "Professor", "Admin"]
+SUBFIELDS = ["Department", "TTO Office", "Incubator"]
+FIELDS = [
+    "Physics",
+    "Chemistry",
+    "Materials Science",
+    "Electrical Engineering",
+    "Bioengineering",
+    "Computer Science",
+    "Photonics",
+    "Robotics",
+]
+FIRST_NAMES = [
+    "Alex", "Maria", "Wei", "Priya", "Jonas", "Fatima", "Hiroshi", "Chloé",
+    "Omar", "Sofia", "Lukas", "Amara", "Mateo", "Yuki", "Noah", "Ingrid",
+]  # fmt: skip
+LAST_NAMES = [
+    "Tremblay", "Garcia", "Chen", "Patel", "Müller", "Haddad", "Tanaka",
+    "Dubois", "Rossi", "Kowalski", "Nakamura", "Okafor", "Silva", "Larsen",
+]  # fmt: skip
+PLACES = [
+    "Toronto", "Montréal", "Zürich", "Lyon", "Delft", "Uppsala", "Kyoto",
+    "Busan", "Haifa", "Melbourne", "Campinas", "Bangalore", "Valencia",
+]  # fmt: skip
+UNIVERSITY_FORMS = [
+    "University of {place}",
+    "{place} Institute of Technology",
+    "{place} Polytechnic",
+    "{place} College of Engineering",
+]
+WORDS = (
+    "prototype licensing patent spin-out funding grant sensor battery "
+    "cryogenic photonic quantum catalyst membrane startup diligence pilot "
+    "timeline investor meeting follow-up agreement disclosure inventor "
+    "manufacturing scale-up partnership samples results roadmap"
+).split()
+
+
+def _university_names(rng: random.Random, count: int) -> list[str]:
+    names = []
+    for i in range(count):
+        form = UNIVERSITY_FORMS[i % len(UNIVERSITY_FORMS)]
+        place = PLACES[(i // len(UNIVERSITY_FORMS)) % len(PLACES)]
+        name = form.format(place=place)
+        cycle = i // (len(UNIVERSITY_FORMS) * len(PLACES))
+        names.append(name if cycle == 0 else f"{name} {cycle + 1}")
+    rng.shuffle(names)
+    return names
+
+
+SYLLABLES = "ka lo mi ner tas vo ri plen dor su quan tex bri mol fen zar".split()
+# Pseudo-words standing in for the long tail of real vocabulary.
+VOCABULARY = [
+    a + b + c for a in SYLLABLES for b in SYLLABLES for c in ("", "ne", "tor")
+]
+
+
+def _word(rng: random.Random) -> str:
+    # Topic words are common; the rest follow a Zipf-like long tail, so
+    # searches match realistic fractions of the emails.
+    if rng.random() < 0.3:
+        return rng.choice(WORDS)
+    # Log-uniform rank: word frequency falls off as 1/rank.
+    return VOCABULARY[int(len(VOCABULARY) ** rng.random()) - 1]
+
+
+def _text(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(_word(rng) for _ in range(rng.randint(low, high)))
+
+
+def populate(conn, universities: int, people: int, emails: int, seed: int = 1):
+    """Fill an empty, initialized database with a synthetic catalog.
+
+    Emails are generated as threads with one to four known participants, so
+    ``emails`` counts email_logs rows and bodies are shared as in real use.
+    """
+    from server.database import insert_email_logs
+
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT OR IGNORE INTO countries (name, code) VALUES (?, ?)", COUNTRIES
+    )
+    country_ids = [
+        row[0]
+        for row in cursor.execute(
+            "SELECT id FROM countries WHERE code IN (%s) ORDER BY code"
+            % ",".join("?" * len(COUNTRIES)),
+            [code for _, code in COUNTRIES],
+        ).fetchall()
+    ]
+
+    cursor.executemany(
+        "INSERT INTO universities (name, ror_id) VALUES (?, ?)",
+        (
+            (name, f"https://ror.org/bench{i:06d}")
+            for i, name in enumerate(_university_names(rng, universities))
+        ),
+    )
+    university_ids = [
+        row[0] for row in cursor.execute("SELECT id FROM universities ORDER BY id")
+    ]
+
+    def person(i):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return (
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}.{i}@example.org",
+            # A few large institutions hold many contacts, as in real data.
+            university_ids[int(len(university_ids) * rng.random() ** 2)],
+            rng.choice(country_ids),
+            rng.choice(SUBFIELDS),
+            rng.choice(FIELDS),
+            rng.choice(ROLES),
+            _text(rng, 0, 12) or None,
+        )
+
+    cursor.executemany(
+        """
+        INSERT INTO people (
+            name, email, university_id, country_id,
+            subfield, subfield_name, role, notes
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (person(i) for i in range(people)),
+    )
+    person_ids = [row[0] for row in cursor.execute("SELECT id FROM people")]
+
+    logged = 0
+    thread = 0
+    while logged < emails and person_ids:
+        thread += 1
+        participants = rng.sample(
+            person_ids, min(len(person_ids), rng.randint(1, 4), emails - logged)
+        )
+        body = _text(rng, 40, 400)
+        subject = _text(rng, 2, 8).capitalize()
+        timestamp = (
+            f"20{rng.randint(20, 26)}-{rng.randint(1, 12):02d}-"
+            f"{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00"
+        )
+        insert_email_logs(
+            cursor, participants, timestamp, subject, body, f"bench-{thread}"
+        )
+        logged += len(participants)
+    conn.commit()
+
+
+def database_path(
+    universities: int, people: int, emails: int, seed: int, directory=None
+) -> Path:
+    directory = Path(directory or os.getenv("SCOUTING_BENCH_DIR", ".benchmarks"))
+    return directory / f"catalog-u{universities}-p{people}-e{emails}-s{seed}.db"
+
+
+def prepare_database(
+    universities: int, people: int, emails: int, seed: int = 1, directory=None
+) -> Path:
+    """Point SCOUTING_DB_PATH at a fresh copy of a synthetic database.
+
+    The generated catalog is cached and copied for each run, so benchmarks
+    that write (e.g. email ingestion) never change the next run's input.
+    Must be called before ``server`` is imported; returns the working copy.
+    """
+    cached = database_path(universities, people, emails, seed, directory)
+    spec_path = cached.with_suffix(".json")
+    work = cached.with_name(cached.stem + "-run.db")
+    spec = {
+        "universities": universities,
+        "people": people,
+        "emails": emails,
+        "seed": seed,
+    }
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    # A leftover write-ahead log would be replayed onto the fresh copy.
+    for suffix in ("", "-wal", "-shm"):
+        work.with_name(work.name + suffix).unlink(missing_ok=True)
+    os.environ["SCOUTING_DB_PATH"] = str(work.resolve())
+    # populate() inserts COUNTRIES; no network access, no variable input.
+    os.environ["SCOUTING_PRELOAD_COUNTRIES"] = "0"
+
+    from server.database import get_connection, initialize_database
+
+    if cached.exists() and spec_path.exists():
+        if json.loads(spec_path.read_text()) == spec:
+            shutil.copyfile(cached, work)
+            initialize_database()  # Picks up schema migrations.
+            return work
+
+    initialize_database()
+    conn = get_connection()
+    try:
+        populate(conn, universities, people, emails, seed)
+    finally:
+        conn.close()
+    shutil.copyfile(work, cached)
+    spec_path.write_text(json.dumps(spec))
+    return work
@@ -1,3 +1,11 @@
-from .main import ClientApp
-
 __version__ = "0.4.0"
+
+
+def __getattr__(name):
+    # The Qt application is imported on first use, so the Qt-free modules
+    # (e.g. ror_loader, which the server shares) import without PyQt6.
+    if name == "ClientApp":
+        from .main import ClientApp
+
+        return ClientApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,140 @@
+import threading
+from collections import OrderedDict
+
 import requests
 
-from .settings import get_server_url
+from .search_cache import SEARCH_COLUMNS, SearchCache
+from .settings import get_server_url, refresh_settings, server_url_from, subscribe
+
+# Seconds to wait for the server to connect or send more data, so a stalled
+# connection fails instead of hanging its caller (e.g. the replica sync).
+REQUEST_TIMEOUT = 15
+
+
+class Transport:
+    """Pooled HTTP session whose base URL follows the settings store.
+
+    Compressed responses are decoded by requests itself. ``get_json`` also
+    remembers ETag/Last-Modified validators per URL and revalidates with a
+    conditional GET, reusing the stored body on 304 Not Modified.
+    """
+
+    max_validators = 128
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._base_url = get_server_url()
+        self._validated = OrderedDict()
+        # Requests running on each session, so a replaced session is only
+        # closed once nothing uses it any more.
+        self._in_flight = {}
+        subscribe(self._on_settings_changed)
+
+    def _on_settings_changed(self, settings: dict):
+        base_url = server_url_from(settings)
+        with self._lock:
+            if base_url == self._base_url:
+                return
+            self._base_url = base_url
+            self._validated.clear()
+            # Pooled connections point at the old server; drop them.
+            old_session, self._session = self._session, requests.Session()
+            if self._in_flight.get(old_session):
+                return
+        old_session.close()
+
+    def url(self, path: str) -> str:
+        refresh_settings()
+        with self._lock:
+            return self._base_url + path
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        refresh_settings()
+        with self._lock:
+            session = self._session
+            url = self._base_url + path
+            self._in_flight[session] = self._in_flight.get(session, 0) + 1
+        try:
+            return session.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                remaining = self._in_flight.pop(session) - 1
+                if remaining:
+                    self._in_flight[session] = remaining
+                retired = not remaining and session is not self._session
+            if retired:
+                session.close()
+
+    def get_json(self, path: str, params=None, **kwargs):
+        """GET ``path`` and decode JSON, revalidating any stored copy."""
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            stored = self._validated.get(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if stored is not None:
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        response = self.request("GET", path, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and stored is not None:
+            with self._lock:
+                if key in self._validated:
+                    self._validated.move_to_end(key)
+            return stored["data"]
+        response.raise_for_status()
+        data = response.json()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            if etag or last_modified:
+                self._validated[key] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "data": data,
+                }
+                self._validated.move_to_end(key)
+                while len(self._validated) > self.max_validators:
+                    self._validated.popitem(last=False)
+            else:
+                self._validated.pop(key, None)
+        return data
+
+
+_transport = None
+_transport_lock = threading.Lock()
+_search_cache = SearchCache()
+
+
+def _get_transport() -> Transport:
+    """The shared transport, created on first use.
+
+    Importing this module must not read (or create) settings.toml.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
+
+
+# Results from a different server are meaningless.
+subscribe(lambda settings: _search_cache.invalidate())
 
 
 def download_people_csv() -> bytes:
-    response = requests.get(get_server_url() + "/people/export_csv")
+    response = _get_transport().request("GET", "/people/export_csv")
     response.raise_for_status()
     return response.content
 
 
 def ping_server():
     try:
-        response = requests.get(get_server_url() + "/ping", timeout=2)
+        response = _get_transport().request("GET", "/ping", timeout=2)
         response.raise_for_status()
         return True
     except Exception:
@@ -20,14 +143,16 @@ def ping_server():
 
 def create_person(data: dict):
     """Submit a new person to the backend."""
-    response = requests.post(get_server_url() + "/people/", json=data)
+    response = _get_transport().request("POST", "/people/", json=data)
+    _search_cache.invalidate()
     response.raise_for_status()
     return response.json()
 
 
 def update_person(person_id: int, data: dict):
     """Send partial update to existing person entry."""
-    response = requests.patch(f"{get_server_url()}/people/{person_id}", json=data)
+    response = _get_transport().request("PATCH", f"/people/{person_id}", json=data)
+    _search_cache.invalidate()
     response.raise_for_status()
     return response.json()
 
@@ -39,8 +164,28 @@ def list_people(
     subfield: str = "",
     offset: int = 0,
     limit: int = 100,
+    use_cache: bool = True,
+    fields: tuple = (),
+    columnar: bool = False,
 ):
-    """Search/filter people."""
+    """Search/filter people.
+
+    ``fields`` limits the returned keys; ``columnar`` asks the server for the
+    compact column format, which is unpacked into dicts here. Narrowing
+    searches are answered from the local search cache when a complete
+    superset of the results is already cached.
+    """
+    fields = tuple(fields)
+    # Local narrowing needs every column the server's text filter matches.
+    use_cache = use_cache and (
+        not fields or all(col in fields for col in SEARCH_COLUMNS)
+    )
+    filters = (role, country, subfield, fields)
+    if use_cache:
+        cached = _search_cache.get(query, filters, offset, limit)
+        if cached is not None:
+            return cached
+
     params = {"offset": offset, "limit": limit}
     if query:
         params["q"] = query
@@ -50,36 +195,106 @@ def list_people(
         params["country"] = country
     if subfield:
         params["subfield"] = subfield
-    response = requests.get(get_server_url() + "/people/", params=params)
+    if fields:
+        params["fields"] = ",".join(fields)
+    if columnar:
+        params["format"] = "columns"
+    people = _get_transport().get_json("/people/", params=params)
+    if columnar:
+        columns = people["columns"]
+        people = [dict(zip(columns, row)) for row in people["rows"]]
+    if use_cache:
+        _search_cache.put(query, filters, offset, limit, people)
+    return people
+
+
+def count_people(
+    query: str = "",
+    role: str = "",
+    country: str = "",
+    subfield: str = "",
+    exact: bool = False,
+):
+    """Return ``(total, estimated)`` for a search without fetching its rows.
+
+    Unless ``exact``, the server may estimate text searches on large tables.
+    """
+    params = {
+        "limit": 0,
+        "fields": "id",
+        "format": "columns",
+        "count": "exact" if exact else "estimate",
+    }
+    if query:
+        params["q"] = query
+    if role:
+        params["role"] = role
+    if country:
+        params["country"] = country
+    if subfield:
+        params["subfield"] = subfield
+    result = _get_transport().get_json("/people/", params=params)
+    return result["total"], result["total_estimated"]
+
+
+def people_facets(
+    query: str = "", role: str = "", country: str = "", subfield: str = ""
+):
+    """Return per-value counts of role, subfield, country and university."""
+    params = {}
+    if query:
+        params["q"] = query
+    if role:
+        params["role"] = role
+    if country:
+        params["country"] = country
+    if subfield:
+        params["subfield"] = subfield
+    return _get_transport().get_json("/people/facets", params=params)
+
+
+def list_people_changes(since: int = 0, limit: int = 1000):
+    """Return people changed or deleted after change version ``since``."""
+    params = {"since": since, "limit": limit}
+    response = _get_transport().request("GET", "/people/changes", params=params)
     response.raise_for_status()
     return response.json()
 
 
+def invalidate_search_cache():
+    _search_cache.invalidate()
+
+
 def delete_person(person_id: int):
-    response = requests.delete(get_server_url() + f"/people/{person_id}")
+    response = _get_transport().request("DELETE", f"/people/{person_id}")
+    _search_cache.invalidate()
     response.raise_for_status()
     return response.json()
 
 
 def list_universities():
     """Return all canonical universities."""
-    response = requests.get(get_server_url() + "/universities/")
+    return _get_transport().get_json("/universities/")
+
+
+def suggest_universities(query: str, limit: int = 10):
+    """Return server-side university suggestions for a partial name."""
+    params = {"q": query, "limit": limit}
+    response = _get_transport().request("GET", "/universities/suggest", params=params)
     response.raise_for_status()
     return response.json()
 
 
 def list_countries():
     """Return all countries."""
-    response = requests.get(get_server_url() + "/countries/")
-    response.raise_for_status()
-    return response.json()
+    return _get_transport().get_json("/countries/")
 
 
 def create_university_alias(alias: str, canonical_name: str):
     """Submit a new university alias."""
     payload = {"alias": alias, "canonical_name": canonical_name}
-    response = requests.post(
-        get_server_url() + "/universities/aliases/", params=payload
+    response = _get_transport().request(
+        "POST", "/universities/aliases/", params=payload
     )
     response.raise_for_status()
     return response.json()
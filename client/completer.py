@@ -0,0 +1,150 @@
+import bisect
+import re
+import threading
+from array import array
+
+from PyQt6.QtCore import QStringListModel, Qt
+from PyQt6.QtWidgets import QCompleter
+
+from .country_data import get_all_country_names
+from .ror_loader import load_university_names, on_indexes_rewritten
+
+MAX_SUGGESTIONS = 15
+# Upper bound on word-index entries scanned per keystroke for multi-word
+# queries, keeping worst-case latency flat for very common words.
+MAX_CANDIDATES = 500
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    return text.casefold()
+
+
+class TypeaheadIndex:
+    """Prefix and word-prefix lookup over a fixed list of names.
+
+    A name matches when it starts with the query, or when every query word
+    starts one of its words ("inst tech" finds "Institute of Technology");
+    text in the middle of a word is not matched.
+
+    Two sorted arrays are kept: every folded name, and every folded word of
+    every name. A keystroke costs a couple of binary searches plus at most
+    ``MAX_CANDIDATES`` candidate checks, independent of how many names there
+    are.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        folded = [_fold(name) for name in self.names]
+
+        order = sorted(range(len(folded)), key=folded.__getitem__)
+        self._folded = folded
+        self._prefix_keys = [folded[i] for i in order]
+        self._prefix_ids = array("I", order)
+
+        tokens = []
+        for i, name in enumerate(folded):
+            for token in set(_TOKEN_RE.findall(name)):
+                tokens.append((token, i))
+        tokens.sort()
+        self._token_keys = [token for token, _ in tokens]
+        self._token_ids = array("I", (i for _, i in tokens))
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _range(keys, prefix):
+        lo = bisect.bisect_left(keys, prefix)
+        # U+10FFFF sorts after any character that can follow the prefix.
+        hi = bisect.bisect_left(keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def search(self, text: str, limit: int = MAX_SUGGESTIONS) -> list[str]:
+        """Return up to ``limit`` names, whole-name prefix matches first."""
+        query = _fold(text.strip())
+        if not query:
+            return []
+
+        results = []
+        seen = set()
+
+        lo, hi = self._range(self._prefix_keys, query)
+        for pos in range(lo, min(hi, lo + limit)):
+            i = self._prefix_ids[pos]
+            seen.add(i)
+            results.append(i)
+        if len(results) >= limit:
+            return [self.names[i] for i in results]
+
+        words = _TOKEN_RE.findall(query)
+        if not words:
+            return [self.names[i] for i in results]
+        # Walk the word index for the most selective word (the one with the
+        # fewest index entries) and check the others against each candidate.
+        ranges = [self._range(self._token_keys, w) for w in words]
+        anchor = min(range(len(words)), key=lambda k: ranges[k][1] - ranges[k][0])
+        others = words[:anchor] + words[anchor + 1 :]
+        lo, hi = ranges[anchor]
+        for pos in range(lo, min(hi, lo + MAX_CANDIDATES)):
+            i = self._token_ids[pos]
+            if i in seen:
+                continue
+            tokens = _TOKEN_RE.findall(self._folded[i])
+            if all(any(t.startswith(w) for t in tokens) for w in others):
+                seen.add(i)
+                results.append(i)
+                if len(results) >= limit:
+                    break
+        return [self.names[i] for i in results]
+
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def _shared_index(key, load):
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = TypeaheadIndex(load())
+        return index
+
+
+def get_university_index() -> TypeaheadIndex:
+    """Return the session-wide university index, building it on first use."""
+    return _shared_index("universities", load_university_names)
+
+
+def get_country_index() -> TypeaheadIndex:
+    return _shared_index("countries", get_all_country_names)
+
+
+@on_indexes_rewritten
+def reset_indexes():
+    """Drop cached indexes, e.g. after the ROR data was refreshed."""
+    with _lock:
+        _indexes.clear()
+
+
+def attach_typeahead(combo, index: TypeaheadIndex, limit: int = MAX_SUGGESTIONS):
+    """Give an editable QComboBox an index-backed completer.
+
+    Suggestions are recomputed from ``index`` on every edit and shown
+    unfiltered by Qt, so the combo box does not need to hold the full list.
+    """
+    model = QStringListModel(combo)
+    completer = QCompleter(model, combo)
+    completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setMaxVisibleItems(limit)
+    combo.setCompleter(completer)
+
+    def on_text_edited(text):
+        model.setStringList(index.search(text, limit))
+        if model.rowCount():
+            completer.complete()
+
+    combo.lineEdit().textEdited.connect(on_text_edited)
+    return completer
@@ -19,17 +19,26 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from . import api
 from .api import (
     create_person,
     delete_person,
     download_people_csv,
     list_people,
+    list_people_changes,
     ping_server,
     update_person,
 )
-from .country_data import get_all_country_names
-from .ror_loader import ensure_ror_data, load_university_names
-from .settings import load_settings, save_settings
+from .completer import attach_typeahead, get_country_index, get_university_index
+from .replica import LocalReplica
+from .ror_loader import ensure_ror_data
+from .settings import (
+    get_server_url,
+    load_settings,
+    save_settings,
+    server_url_from,
+    subscribe,
+)
 
 
 class DownloadThread(QThread):
@@ -40,11 +49,39 @@ class DownloadThread(QThread):
     def run(self):
         try:
             ensure_ror_data(status_cb=lambda msg: self.status.emit(msg))
+            # Build the shared typeahead index off the GUI thread.
+            get_university_index()
             self.success.emit()
         except Exception:
             self.failure.emit(traceback.format_exc())
 
 
+class ReplicaSyncThread(QThread):
+    """Replays offline edits, then pulls server changes into the replica.
+
+    Uses its own connection to the replica file, since SQLite connections
+    stay on the thread that opened them.
+    """
+
+    synced = pyqtSignal(list, int)  # conflicts, rows changed
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+
+    def run(self):
+        replica = LocalReplica(self.path)
+        try:
+            conflicts = replica.replay(api, list_people_changes)
+            changed = replica.sync(list_people_changes)
+            self.synced.emit(conflicts, changed)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            replica.close()
+
+
 class UniversityDataLoaderDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -122,6 +159,17 @@ class SettingsDialog(QDialog):
 
 
 ROLES = ["Department Head", "TTO Officer", "Professor", "Admin"]
+# Person fields shown in the results table, in column order.
+TABLE_COLUMNS = (
+    "name",
+    "email",
+    "university",
+    "country",
+    "subfield",
+    "subfield_name",
+    "role",
+    "notes",
+)
 SUBFIELDS = ["Department", "TTO Office", "Incubator"]
 
 
@@ -140,14 +188,15 @@ class NewPersonDialog(QDialog):
         self.university_input.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         self.university_input.setMaxVisibleItems(15)
         self.university_input.setPlaceholderText("Start typing...")
-        self.university_input.addItems(load_university_names())
+        attach_typeahead(self.university_input, get_university_index())
 
         self.country_input = QComboBox()
         self.country_input.setEditable(True)
         self.country_input.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         self.country_input.setMaxVisibleItems(15)
         self.country_input.setPlaceholderText("Start typing...")
-        self.country_input.addItems(get_all_country_names())
+        self.country_input.addItems(get_country_index().names)
+        attach_typeahead(self.country_input, get_country_index())
 
         self.subfield_input = QComboBox()
         self.subfield_input.addItems(SUBFIELDS)
@@ -220,7 +269,7 @@ class EditPersonDialog(QDialog):
         self.university_input.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         self.university_input.setMaxVisibleItems(15)
         self.university_input.setPlaceholderText("Start typing...")
-        self.university_input.addItems(load_university_names())
+        attach_typeahead(self.university_input, get_university_index())
         self.university_input.setCurrentText(data["university"])
 
         # --- Country ---
@@ -229,7 +278,8 @@ class EditPersonDialog(QDialog):
         self.country_input.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         self.country_input.setMaxVisibleItems(15)
         self.country_input.setPlaceholderText("Start typing...")
-        self.country_input.addItems(get_all_country_names())
+        self.country_input.addItems(get_country_index().names)
+        attach_typeahead(self.country_input, get_country_index())
         self.country_input.setCurrentText(data["country"])
 
         self.subfield_input = QComboBox()
@@ -281,13 +331,23 @@ class EditPersonDialog(QDialog):
 
 
 class ClientApp(QWidget):
+    # Settings listeners may run on any thread; the replica lives on this one.
+    server_changed = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.entries_per_page = 50
         self.current_page = 0
         self.universities = []
         self.countries = []
+        self.connected = False
+        self.replica = LocalReplica()
+        self._sync_thread = None
+        self._sync_again = False
+        self.server_changed.connect(self._on_server_changed)
+        subscribe(lambda settings: self.server_changed.emit(server_url_from(settings)))
         self.init_ui()
+        QTimer.singleShot(0, lambda: self._on_server_changed(get_server_url()))
 
     def init_ui(self):
         self.setWindowTitle("People Catalog")
@@ -369,6 +429,9 @@ class ClientApp(QWidget):
         self.connection_timer = QTimer(self)
         self.connection_timer.timeout.connect(self.check_connection)
         self.connection_timer.start(100)  # every 5 seconds for ongoing checks
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.sync_replica)
+        self.sync_timer.start(5000)
         QTimer.singleShot(500, self.check_connection)
         QTimer.singleShot(600, self.perform_search)
         QTimer.singleShot(500, self.perform_search)
@@ -402,6 +465,9 @@ class ClientApp(QWidget):
 
     def check_connection(self):
         connected = ping_server()
+        reconnected = connected and not self.connected
+        self.connected = connected
+        has_selection = bool(self.results_table.selectionModel().selectedRows())
         if connected:
             self.status_label.setText("Status: Connected")
             self.status_label.setStyleSheet("color: green;")
@@ -409,12 +475,22 @@ class ClientApp(QWidget):
             # Enable main features
             self.search_button.setEnabled(True)
             self.new_entry_button.setEnabled(True)
-            self.edit_button.setEnabled(
-                bool(self.results_table.selectionModel().selectedRows())
-            )
-            self.delete_button.setEnabled(
-                bool(self.results_table.selectionModel().selectedRows())
+            self.edit_button.setEnabled(has_selection)
+            self.delete_button.setEnabled(has_selection)
+            if reconnected:
+                self.sync_replica()
+        elif self._replica_ready():
+            pending = self.replica.pending_count()
+            self.status_label.setText(
+                f"Status: Disconnected - working offline ({pending} pending)"
             )
+            self.status_label.setStyleSheet("color: orange;")
+
+            # The local replica keeps searching and editing available.
+            self.search_button.setEnabled(True)
+            self.new_entry_button.setEnabled(True)
+            self.edit_button.setEnabled(has_selection)
+            self.delete_button.setEnabled(has_selection)
         else:
             self.status_label.setText("Status: Disconnected")
             self.status_label.setStyleSheet("color: red;")
@@ -425,10 +501,103 @@ class ClientApp(QWidget):
             self.edit_button.setEnabled(False)
             self.delete_button.setEnabled(False)
 
+    def _replica_ready(self) -> bool:
+        """Whether the replica holds a full copy of the current server's data."""
+        return self.replica.is_ready and self.replica.server_url == get_server_url()
+
+    def _on_server_changed(self, server_url):
+        if self.replica.bind_server(server_url):
+            return
+        pending = self.replica.pending_count()
+        answer = QMessageBox.question(
+            self,
+            "Unsent Offline Changes",
+            f"{pending} change(s) made offline against {self.replica.server_url} "
+            "have not been sent yet.\n\n"
+            "Discard them and use the new server? Choose No to keep them; "
+            "they are sent once you switch back to that server.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            self.replica.bind_server(server_url, discard_pending=True)
+
+    def _flush_pending(self):
+        """Send queued offline edits to the replica's server, if reachable."""
+        if self._sync_thread is not None:
+            self._sync_thread.wait()
+        if not (self.replica.pending_count() and self._replica_ready()):
+            return
+        if not ping_server():
+            return
+        try:
+            conflicts = self.replica.replay(api, list_people_changes)
+        except requests.RequestException as e:
+            print("Sending offline changes failed:", e)
+            return
+        self._on_replica_synced(conflicts, 0)
+
+    def sync_replica(self):
+        """Replay offline edits and pull server changes in the background."""
+        if not self.connected or self.replica.server_url != get_server_url():
+            return
+        if self._sync_thread is not None:
+            self._sync_again = True
+            return
+        self._sync_thread = ReplicaSyncThread(self.replica.path, self)
+        self._sync_thread.synced.connect(self._on_replica_synced)
+        self._sync_thread.failed.connect(
+            lambda message: print("Replica sync failed:", message)
+        )
+        self._sync_thread.finished.connect(self._on_sync_thread_finished)
+        self._sync_thread.start()
+
+    def _on_sync_thread_finished(self):
+        self._sync_thread.deleteLater()
+        self._sync_thread = None
+        if self._sync_again:
+            self._sync_again = False
+            self.sync_replica()
+
+    def _on_replica_synced(self, conflicts, changed):
+        if conflicts:
+            QMessageBox.warning(
+                self,
+                "Sync Conflicts",
+                "Some offline changes were not applied:\n\n" + "\n".join(conflicts),
+            )
+        if changed or conflicts:
+            self.perform_search()
+
+    def closeEvent(self, event):
+        if self._sync_thread is not None:
+            self._sync_thread.wait()
+        super().closeEvent(event)
+
+    def _write(self, online, offline):
+        """Run ``online`` against the server, or queue ``offline`` locally.
+
+        Returns True if the change was only queued.
+        """
+        if self.connected:
+            try:
+                online()
+                self.sync_replica()
+                return False
+            except (requests.ConnectionError, requests.Timeout):
+                self.connected = False
+        if not self._replica_ready():
+            raise requests.ConnectionError("Server is unreachable.")
+        offline()
+        return True
+
     def open_settings_dialog(self):
         dialog = SettingsDialog(self)
         if dialog.exec():
             new_settings = dialog.get_settings()
+            if server_url_from({"server": new_settings}) != get_server_url():
+                # Queued edits belong to the server they were made against.
+                self._flush_pending()
             save_settings({"server": new_settings})
             QMessageBox.information(self, "Settings Saved", "Success")
 
@@ -453,8 +622,14 @@ class ClientApp(QWidget):
             return
 
         try:
-            delete_person(person_id)
-            QMessageBox.information(self, "Deleted", "Person deleted successfully.")
+            queued = self._write(
+                lambda: delete_person(person_id),
+                lambda: self.replica.queue_delete(person_id),
+            )
+            message = "Person deleted successfully."
+            if queued:
+                message += "\nThe deletion will be sent when the server is reachable."
+            QMessageBox.information(self, "Deleted", message)
             self.perform_search()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to delete person: {e}")
@@ -470,7 +645,19 @@ class ClientApp(QWidget):
     def perform_search(self):
         try:
             query = self.search_input.text().strip()
-            people = list_people(query=query, offset=0, limit=self.entries_per_page)
+            if self._replica_ready():
+                # Answered locally, online or not; syncs refresh the table.
+                people = self.replica.search(
+                    query=query, offset=0, limit=self.entries_per_page
+                )
+            else:
+                people = list_people(
+                    query=query,
+                    offset=0,
+                    limit=self.entries_per_page,
+                    fields=("id",) + TABLE_COLUMNS,
+                    columnar=True,
+                )
             self.populate_table(people)
         except Exception as e:
             QMessageBox.warning(self, "Search Error", f"Could not fetch data:\n{e}")
@@ -480,18 +667,7 @@ class ClientApp(QWidget):
         for row_data in data:
             row_pos = self.results_table.rowCount()
             self.results_table.insertRow(row_pos)
-            for col, key in enumerate(
-                [
-                    "name",
-                    "email",
-                    "university",
-                    "country",
-                    "subfield",
-                    "subfield_name",
-                    "role",
-                    "notes",
-                ]
-            ):
+            for col, key in enumerate(TABLE_COLUMNS):
                 item = QTableWidgetItem(row_data.get(key, ""))
                 item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
                 if col == 0:
@@ -503,8 +679,14 @@ class ClientApp(QWidget):
         if dialog.exec():
             data = dialog.get_data()
             try:
-                create_person(data)
-                QMessageBox.information(self, "Success", "Person added successfully.")
+                queued = self._write(
+                    lambda: create_person(data),
+                    lambda: self.replica.queue_create(data),
+                )
+                message = "Person added successfully."
+                if queued:
+                    message += "\nIt will be sent when the server is reachable."
+                QMessageBox.information(self, "Success", message)
                 self.perform_search()
             except requests.HTTPError as e:
                 try:
@@ -544,8 +726,14 @@ class ClientApp(QWidget):
 
             new_data = dialog.get_data()
             try:
-                update_person(person_id, new_data)
-                QMessageBox.information(self, "Success", "Person updated successfully.")
+                queued = self._write(
+                    lambda: update_person(person_id, new_data),
+                    lambda: self.replica.queue_update(person_id, new_data),
+                )
+                message = "Person updated successfully."
+                if queued:
+                    message += "\nThe update will be sent when the server is reachable."
+                QMessageBox.information(self, "Success", message)
                 self.perform_search()
                 return
             except requests.HTTPError as e:
@@ -0,0 +1,130 @@
+import bisect
+import mmap
+import os
+import struct
+from pathlib import Path
+
+# Layout:
+#   magic "RORN" | format version | offset format | count
+#   | offsets[count + 1] | UTF-8 blob
+# The header's offset format is the struct code of one offset ("<I",
+# padded to 4 bytes), so files read the same on every platform.
+# Names are stored sorted and de-duplicated; offsets[i]:offsets[i + 1] slices
+# name i out of the blob, so lookups never decode more than they return.
+MAGIC = b"RORN"
+FORMAT_VERSION = 2
+OFFSET_FORMAT = "<I"
+_HEADER = struct.Struct("<4sI4sI")
+_OFFSET = struct.Struct(OFFSET_FORMAT)
+_OFFSET_PAIR = struct.Struct("<2I")
+
+
+def write_name_index(path: Path, names) -> int:
+    """Write ``names`` as a sorted binary index; returns the number stored."""
+    encoded = sorted({name.encode("utf-8") for name in names if name})
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC, FORMAT_VERSION, OFFSET_FORMAT.encode("ascii"), len(encoded)
+            )
+        )
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for data in encoded:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return len(encoded)
+
+
+def _header_ok(data) -> bool:
+    if len(data) < _HEADER.size:
+        return False
+    magic, version, offset_format, _ = _HEADER.unpack_from(data, 0)
+    return (
+        magic == MAGIC
+        and version == FORMAT_VERSION
+        and offset_format.rstrip(b"\0") == OFFSET_FORMAT.encode("ascii")
+    )
+
+
+def is_current_index(path) -> bool:
+    """Whether ``path`` exists and was written in this module's format."""
+    try:
+        with open(path, "rb") as f:
+            return _header_ok(f.read(_HEADER.size))
+    except FileNotFoundError:
+        return False
+
+
+class NameIndex:
+    """Read-only, memory-mapped view of a file written by ``write_name_index``."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if not _header_ok(self._map):
+            self._map.close()
+            raise ValueError(f"{self.path} is not a current university name index.")
+        self._count = _HEADER.unpack_from(self._map, 0)[3]
+        self._blob_start = _HEADER.size + _OFFSET.size * (self._count + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _raw(self, i: int) -> bytes:
+        start, end = _OFFSET_PAIR.unpack_from(
+            self._map, _HEADER.size + _OFFSET.size * i
+        )
+        return self._map[self._blob_start + start : self._blob_start + end]
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._raw(i).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._raw(i).decode("utf-8")
+
+    def __contains__(self, name: str) -> bool:
+        data = name.encode("utf-8")
+        i = self._bisect_left(data)
+        return i < self._count and self._raw(i) == data
+
+    def _bisect_left(self, data: bytes) -> int:
+        return bisect.bisect_left(_RawView(self), data)
+
+    def prefix_range(self, prefix: str) -> range:
+        """Indices of names starting with ``prefix`` (case-sensitive)."""
+        data = prefix.encode("utf-8")
+        # 0xFF never occurs in UTF-8, so it sorts after every continuation.
+        return range(self._bisect_left(data), self._bisect_left(data + b"\xff"))
+
+    def to_list(self) -> list[str]:
+        return list(self)
+
+    def close(self):
+        self._map.close()
+
+
+class _RawView:
+    """Sequence adapter so ``bisect`` can compare raw UTF-8 bytes."""
+
+    def __init__(self, index: NameIndex):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, i):
+        return self._index._raw(i)
@@ -0,0 +1,378 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import requests
+
+from .settings import APP_NAME
+
+REPLICA_PATH = Path.home() / APP_NAME / "replica.db"
+
+
+def _error_detail(error: Exception) -> str:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        try:
+            return error.response.json().get("detail", str(error))
+        except Exception:
+            return error.response.text
+    return str(error)
+
+
+class LocalReplica:
+    """Local SQLite copy of the people catalog, kept current from the
+    server's change feed.
+
+    Searches are answered from the copy. Writes made while the server is
+    unreachable are applied locally, queued, and replayed by ``replay()``;
+    ones that collide with newer server changes are reported as conflicts.
+    """
+
+    def __init__(self, path: Path = REPLICA_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS people (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                university TEXT NOT NULL,
+                country TEXT NOT NULL,
+                university_id INTEGER,
+                country_id INTEGER,
+                subfield TEXT NOT NULL,
+                subfield_name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                notes TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
+                pending_delete INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS pending_ops (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL,
+                person_id INTEGER NOT NULL,
+                payload TEXT,
+                base_version INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS people_fts USING fts5(
+                name, email, university, country,
+                content='people', content_rowid='id', tokenize='trigram'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS people_fts_insert AFTER INSERT ON people
+            BEGIN
+                INSERT INTO people_fts (rowid, name, email, university, country)
+                VALUES (NEW.id, NEW.name, NEW.email, NEW.university, NEW.country);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS people_fts_delete AFTER DELETE ON people
+            BEGIN
+                INSERT INTO people_fts (people_fts, rowid, name, email, university, country)
+                VALUES ('delete', OLD.id, OLD.name, OLD.email, OLD.university, OLD.country);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS people_fts_update AFTER UPDATE ON people
+            BEGIN
+                INSERT INTO people_fts (people_fts, rowid, name, email, university, country)
+                VALUES ('delete', OLD.id, OLD.name, OLD.email, OLD.university, OLD.country);
+                INSERT INTO people_fts (rowid, name, email, university, country)
+                VALUES (NEW.id, NEW.name, NEW.email, NEW.university, NEW.country);
+            END;
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # --- Metadata ---
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    @property
+    def sync_version(self) -> int:
+        return int(self._get_meta("sync_version", 0))
+
+    @property
+    def is_ready(self) -> bool:
+        """True once a full sync has completed at least once."""
+        return self._get_meta("synced") == "1"
+
+    @property
+    def server_url(self):
+        """The server this replica was built from."""
+        return self._get_meta("server_url")
+
+    def bind_server(self, server_url: str, discard_pending: bool = False) -> bool:
+        """Start over if the replica was built from a different server.
+
+        Offline edits queued for the old server are not thrown away unless
+        ``discard_pending``: the replica then stays on the old server and
+        False is returned.
+        """
+        if self.server_url == server_url:
+            return True
+        if self.pending_count() and not discard_pending:
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM people")
+            self.conn.execute("DELETE FROM pending_ops")
+            self.conn.execute("DELETE FROM meta")
+            self._set_meta("server_url", server_url)
+        return True
+
+    # --- Pull ---
+
+    def sync(self, fetch_changes) -> int:
+        """Apply server changes via ``fetch_changes(since)``; returns the count.
+
+        Rows with queued local edits are refreshed too; ``replay()`` re-applies
+        the queued operations on top of the server state.
+        """
+        applied = 0
+        while True:
+            page = fetch_changes(self.sync_version)
+            with self.conn:
+                for change in page["changes"]:
+                    if change["op"] == "delete":
+                        self.conn.execute(
+                            "DELETE FROM people WHERE id = ?", (change["id"],)
+                        )
+                    else:
+                        self._upsert(change["person"], change["version"])
+                    applied += 1
+                self._set_meta("sync_version", page["version"])
+                if not page["has_more"]:
+                    self._set_meta("synced", 1)
+            if not page["has_more"]:
+                return applied
+
+    def _upsert(self, person: dict, version: int):
+        self.conn.execute(
+            """
+            INSERT INTO people (
+                id, name, email, university, country, university_id, country_id,
+                subfield, subfield_name, role, notes, version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name, email = excluded.email,
+                university = excluded.university, country = excluded.country,
+                university_id = excluded.university_id,
+                country_id = excluded.country_id, subfield = excluded.subfield,
+                subfield_name = excluded.subfield_name, role = excluded.role,
+                notes = excluded.notes, version = excluded.version
+            """,
+            (
+                person["id"],
+                person["name"],
+                person["email"],
+                person["university"],
+                person["country"],
+                person.get("university_id"),
+                person.get("country_id"),
+                person["subfield"],
+                person["subfield_name"],
+                person["role"],
+                person.get("notes"),
+                version,
+            ),
+        )
+
+    # --- Local search ---
+
+    def search(
+        self,
+        query: str = "",
+        role: str = "",
+        country: str = "",
+        subfield: str = "",
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Same filters and ordering as ``GET /people/``, answered locally."""
+        sql = "SELECT * FROM people p"
+        filters = ["p.pending_delete = 0"]
+        params = []
+        if role:
+            filters.append("p.role = ?")
+            params.append(role)
+        if country:
+            filters.append("p.country = ?")
+            params.append(country)
+        if subfield:
+            filters.append("p.subfield = ?")
+            params.append(subfield)
+        if query:
+            if len(query) >= 3 and "%" not in query and "_" not in query:
+                # Trigram FTS answers substring matches from the index.
+                filters.append(
+                    "p.id IN (SELECT rowid FROM people_fts WHERE people_fts MATCH ?)"
+                )
+                params.append('"' + query.replace('"', '""') + '"')
+            else:
+                filters.append("""
+                    (
+                        p.name LIKE ?
+                        OR p.email LIKE ?
+                        OR p.university LIKE ?
+                        OR p.country LIKE ?
+                    )
+                """)
+                params.extend([f"%{query}%"] * 4)
+        sql += " WHERE " + " AND ".join(filters)
+        # Unsynced local creates have negative ids and are the newest rows.
+        sql += " ORDER BY p.id < 0 DESC, abs(p.id) DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    # --- Offline writes ---
+
+    def pending_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pending_ops").fetchone()[0]
+
+    def _version_of(self, person_id: int) -> int:
+        row = self.conn.execute(
+            "SELECT version FROM people WHERE id = ?", (person_id,)
+        ).fetchone()
+        return row["version"] if row else 0
+
+    def queue_create(self, data: dict) -> int:
+        with self.conn:
+            row = self.conn.execute("SELECT MIN(id) FROM people").fetchone()
+            temp_id = min(row[0] or 0, 0) - 1
+            self._upsert(dict(data, id=temp_id), 0)
+            self.conn.execute(
+                "INSERT INTO pending_ops (op, person_id, payload) VALUES (?, ?, ?)",
+                ("create", temp_id, json.dumps(data)),
+            )
+        return temp_id
+
+    def queue_update(self, person_id: int, data: dict):
+        with self.conn:
+            if person_id < 0:
+                # Not on the server yet: fold the edit into the queued create.
+                self.conn.execute(
+                    "UPDATE pending_ops SET payload = ? "
+                    "WHERE op = 'create' AND person_id = ?",
+                    (json.dumps(data), person_id),
+                )
+            else:
+                self.conn.execute(
+                    "INSERT INTO pending_ops (op, person_id, payload, base_version) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        "update",
+                        person_id,
+                        json.dumps(data),
+                        self._version_of(person_id),
+                    ),
+                )
+            self._upsert(dict(data, id=person_id), self._version_of(person_id))
+
+    def queue_delete(self, person_id: int):
+        with self.conn:
+            if person_id < 0:
+                self.conn.execute(
+                    "DELETE FROM pending_ops WHERE person_id = ?", (person_id,)
+                )
+                self.conn.execute("DELETE FROM people WHERE id = ?", (person_id,))
+            else:
+                # Keep the row (hidden) so replay can still see its version.
+                self.conn.execute(
+                    "INSERT INTO pending_ops (op, person_id, base_version) "
+                    "VALUES (?, ?, ?)",
+                    ("delete", person_id, self._version_of(person_id)),
+                )
+                self.conn.execute(
+                    "UPDATE people SET pending_delete = 1 WHERE id = ?", (person_id,)
+                )
+
+    # --- Push ---
+
+    def _restore(self, person_id: int):
+        """Undo a hidden local delete after its replay was rejected."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE people SET pending_delete = 0 WHERE id = ?", (person_id,)
+            )
+
+    def replay(self, api, fetch_changes) -> list[str]:
+        """Send queued operations to the server in order.
+
+        The replica is brought up to date before each queued edit, so it is
+        checked against the server's current version of the row; edits to
+        rows that changed on the server meanwhile are dropped and reported.
+        Returns human-readable conflict descriptions.
+        """
+        ops = self.conn.execute("SELECT * FROM pending_ops ORDER BY seq").fetchall()
+        if not ops:
+            return []
+
+        # Person -> server version after an edit replayed here. Later edits
+        # queued against the same row were based on the version before it.
+        replayed = {}
+        conflicts = []
+        for op in ops:
+            payload = json.loads(op["payload"]) if op["payload"] else None
+            person_id = op["person_id"]
+            try:
+                if op["op"] == "create":
+                    api.create_person(payload)
+                else:
+                    self.sync(fetch_changes)
+                    server_version = self._version_of(person_id)
+                    base_version = replayed.get(person_id, op["base_version"])
+                    label = (payload or {}).get("name") or f"person {person_id}"
+                    if server_version == 0:
+                        if op["op"] == "update":
+                            conflicts.append(
+                                f"Update of {label} skipped: deleted on the server."
+                            )
+                    elif server_version != base_version:
+                        conflicts.append(
+                            f"{op['op'].capitalize()} of {label} skipped: "
+                            "changed on the server in the meantime."
+                        )
+                        self._restore(person_id)
+                    elif op["op"] == "update":
+                        api.update_person(person_id, payload)
+                        self.sync(fetch_changes)
+                        replayed[person_id] = self._version_of(person_id)
+                    else:
+                        api.delete_person(person_id)
+            except (requests.ConnectionError, requests.Timeout):
+                # Still offline: keep this and later operations queued.
+                break
+            except Exception as e:
+                label = (payload or {}).get("name") or f"person {person_id}"
+                conflicts.append(
+                    f"{op['op'].capitalize()} of {label} failed: {_error_detail(e)}"
+                )
+                self._restore(person_id)
+
+            with self.conn:
+                self.conn.execute("DELETE FROM pending_ops WHERE seq = ?", (op["seq"],))
+                if op["op"] == "create":
+                    self.conn.execute("DELETE FROM people WHERE id = ?", (person_id,))
+
+        self.sync(fetch_changes)
+        return conflicts
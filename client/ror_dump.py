@@ -0,0 +1,159 @@
+"""Reading ROR data dumps, shared by the client and the server.
+
+A dump is the zip (or the schema_v2 JSON file inside it) published on
+Zenodo for each ROR release. Records are parsed one at a time, so memory
+use does not depend on the dump's size.
+"""
+
+import codecs
+import contextlib
+import json
+import re
+import zipfile
+from pathlib import Path
+
+import requests
+
+ROR_URL = (
+    "https://zenodo.org/records/15298417/files/v1.64-2025-04-28-ror-data.zip?download=1"
+)
+# Downloads are kept per release (ror_dump-v1.64.zip), so a file left by an
+# interrupted run is only ever resumed for the release it belongs to.
+ROR_ZIP_PATTERN = "ror_dump-{version}.zip"
+
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PARSE_CHUNK_SIZE = 1 << 20
+# A ROR record is a few KB; an element this long means the input is broken.
+MAX_ELEMENT_SIZE = 16 << 20
+
+
+def download_with_resume(url, dest: Path, update):
+    """Stream ``url`` to ``dest``, resuming a previous partial download."""
+    part_path = dest.with_suffix(dest.suffix + ".part")
+    have = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={have}-"} if have else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 416:
+            # Range starts at EOF: the partial file is already complete.
+            part_path.replace(dest)
+            return
+        response.raise_for_status()
+        if have and response.status_code != 206:
+            update("Server does not support resume; restarting download...")
+            have = 0
+
+        length = response.headers.get("Content-Length")
+        total = have + int(length) if length else None
+        done = have
+        last_percent = None
+        with open(part_path, "ab" if have else "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                done += len(chunk)
+                if total:
+                    percent = done * 100 // total
+                    if percent != last_percent:
+                        last_percent = percent
+                        update(
+                            f"Downloading ROR data... {percent}% "
+                            f"({done / 1e6:.1f} / {total / 1e6:.1f} MB)"
+                        )
+                else:
+                    update(f"Downloading ROR data... {done / 1e6:.1f} MB")
+
+    part_path.replace(dest)
+
+
+def iter_json_array(
+    binary_file, chunk_size=PARSE_CHUNK_SIZE, max_element_size=MAX_ELEMENT_SIZE
+):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory.
+    Raises ValueError when an element cannot be decoded from
+    ``max_element_size`` characters, instead of buffering the rest of a
+    malformed file.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = binary_file.read(chunk_size)
+        if not chunk:
+            eof = True
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+    while True:
+        # Skip whitespace and separators between elements.
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            fill()
+
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON array.")
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("Expected a JSON array.")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise
+            if len(buffer) - pos > max_element_size:
+                raise ValueError(
+                    f"No JSON value decodes within {max_element_size} characters: {e}"
+                ) from e
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A number could continue in the next chunk; decode it again.
+            fill()
+            continue
+        pos = end
+        yield value
+
+
+def dataset_version(source) -> str:
+    """Derive the ROR release (e.g. ``v1.64``) from a dump URL or file name."""
+    name = str(source).split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+    match = re.search(r"v\d+(?:\.\d+)+", name)
+    return match.group(0) if match else Path(name).stem
+
+
+@contextlib.contextmanager
+def open_dump(path: Path):
+    """Yield an iterator over the records of a ROR zip or schema_v2 JSON file."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path, "r") as zipf:
+            json_name = next(
+                (name for name in zipf.namelist() if "schema_v2.json" in name), None
+            )
+            if not json_name:
+                raise RuntimeError("Expected JSON file not found in ROR zip.")
+            with zipf.open(json_name) as json_file:
+                yield iter_json_array(json_file)
+    else:
+        with open(path, "rb") as json_file:
+            yield iter_json_array(json_file)
+
+
+def is_url(source) -> bool:
+    return str(source).startswith(("http://", "https://"))
@@ -1,68 +1,216 @@
+import argparse
 import json
-import zipfile
+import os
+import threading
 from pathlib import Path
 
-import requests
+from .name_index import NameIndex, is_current_index, write_name_index
+from .ror_dump import (
+    ROR_URL,
+    ROR_ZIP_PATTERN,
+    dataset_version,
+    download_with_resume,
+    is_url,
+    open_dump,
+)
+from .ror_store import RorStore
 
 APP_NAME = "scouting-database"
 DATA_DIR = Path.home() / APP_NAME
-ROR_ZIP_PATH = DATA_DIR / "ror_dump.zip"
+# Legacy JSON list, converted to ROR_INDEX_PATH on first use.
 ROR_NAMES_PATH = DATA_DIR / "university_names.json"
+ROR_INDEX_PATH = DATA_DIR / "university_names.idx"
+ROR_ALIAS_INDEX_PATH = DATA_DIR / "university_aliases.idx"
+ROR_STORE_PATH = DATA_DIR / "ror_store.db"
 
-ROR_URL = (
-    "https://zenodo.org/records/15298417/files/v1.64-2025-04-28-ror-data.zip?download=1"
-)
+# URL or local path of the dump to build from; point at a file to work offline.
+ROR_SOURCE = os.getenv("SCOUTING_ROR_SOURCE", ROR_URL)
 
 
-def ensure_ror_data(status_cb=None):
+# Separates alias from display name in ROR_ALIAS_INDEX_PATH entries, so the
+# sorted index doubles as an alias -> display name lookup table.
+ALIAS_SEPARATOR = "\t"
+
+
+def dump_download_path(version: str) -> Path:
+    """Where the dump of ``version`` is downloaded.
+
+    Downloads of other releases, complete or partial, are deleted.
+    """
+    path = DATA_DIR / ROR_ZIP_PATTERN.format(version=version)
+    keep = {path.name, path.name + ".part"}
+    for stale in DATA_DIR.glob("ror_dump*.zip*"):
+        if stale.name not in keep:
+            stale.unlink()
+    return path
+
+
+def _write_indexes(store: RorStore, update):
+    update("Writing university index...")
+    write_name_index(
+        ROR_ALIAS_INDEX_PATH,
+        (
+            f"{alias}{ALIAS_SEPARATOR}{display}"
+            for alias, display in store.alias_pairs()
+            if ALIAS_SEPARATOR not in alias
+        ),
+    )
+    count = write_name_index(ROR_INDEX_PATH, store.display_names())
+    _reset_name_cache()
+    return count
+
+
+def refresh_ror_data(source=None, status_cb=None, force=False) -> dict:
+    """Bring the local ROR store up to date with ``source``.
+
+    ``source`` may be a download URL or a local zip/JSON dump, so refreshes
+    also work offline. Only records that differ from the stored version are
+    rewritten; the name indexes are rebuilt only when something changed.
+    """
+
     def update(msg):
         if status_cb:
             status_cb(msg)
 
+    source = source or ROR_SOURCE
+    version = dataset_version(source)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    if ROR_NAMES_PATH.exists():
-        update("University data already prepared.")
-        return
-
-    if not ROR_ZIP_PATH.exists():
-        update("Downloading ROR ZIP data...")
-        response = requests.get(ROR_URL, timeout=30)
-        response.raise_for_status()
-        with open(ROR_ZIP_PATH, "wb") as f:
-            f.write(response.content)
-
-    update("Extracting university list...")
-    with zipfile.ZipFile(ROR_ZIP_PATH, "r") as zipf:
-        json_name = next(
-            (name for name in zipf.namelist() if "schema_v2.json" in name), None
+    with RorStore(ROR_STORE_PATH) as store:
+        if store.version == version and not force:
+            if not is_current_index(ROR_INDEX_PATH):
+                # Index missing or from an older format: the store has it all.
+                count = _write_indexes(store, update)
+                update(f"{count} university names saved.")
+            update(f"University data is up to date ({version}).")
+            return {"added": 0, "changed": 0, "withdrawn": 0, "removed": 0}
+
+        if is_url(source):
+            dump_path = dump_download_path(version)
+            if not dump_path.exists():
+                update("Downloading ROR ZIP data...")
+                download_with_resume(source, dump_path, update)
+        else:
+            dump_path = Path(source)
+            if not dump_path.exists():
+                raise FileNotFoundError(f"ROR dump not found: {dump_path}")
+
+        update(f"Applying ROR {version}...")
+        with open_dump(dump_path) as records:
+            stats = store.apply_dump(records, version)
+        update(
+            "{added} added, {changed} changed, {withdrawn} withdrawn, "
+            "{removed} removed.".format(**stats)
         )
-        if not json_name:
-            raise RuntimeError("Expected JSON file not found in ROR zip.")
 
-        with zipf.open(json_name) as json_file:
-            records = json.load(json_file)
+        if any(stats.values()) or not is_current_index(ROR_INDEX_PATH):
+            count = _write_indexes(store, update)
+            update(f"{count} university names saved.")
 
-    update("Parsing university names...")
-    names = []
-    for record in records:
-        for name_entry in record.get("names", []):
-            if "ror_display" in name_entry.get("types", []):
-                names.append(name_entry["value"])
-                break
+    if is_url(source) and dump_path.exists():
+        dump_path.unlink()
+        update("Cleaned up ROR ZIP file.")
+    return stats
 
-    with open(ROR_NAMES_PATH, "w", encoding="utf-8") as f:
-        json.dump(sorted(set(names)), f, indent=2)
 
-    update(f"{len(names)} university names saved.")
+def ensure_ror_data(status_cb=None):
+    def update(msg):
+        if status_cb:
+            status_cb(msg)
 
-    if ROR_ZIP_PATH.exists():
-        ROR_ZIP_PATH.unlink()
-        update("Cleaned up ROR ZIP file.")
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    if is_current_index(ROR_INDEX_PATH):
+        update("University data already prepared.")
+        return
 
+    if ROR_NAMES_PATH.exists():
+        update("Converting university list to index...")
+        with open(ROR_NAMES_PATH, "r", encoding="utf-8") as f:
+            write_name_index(ROR_INDEX_PATH, json.load(f))
+        ROR_NAMES_PATH.unlink()
+        update("University data already prepared.")
+        return
 
-def load_university_names() -> list[str]:
-    if not ROR_NAMES_PATH.exists():
-        raise RuntimeError("ROR university names not downloaded yet.")
-    with open(ROR_NAMES_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    refresh_ror_data(status_cb=status_cb)
+
+
+_index_lock = threading.Lock()
+_name_index = None
+_name_list = None
+_alias_index = None
+_index_listeners = []
+
+
+def on_indexes_rewritten(callback):
+    """Register ``callback()`` to run after the name indexes are rewritten."""
+    with _index_lock:
+        _index_listeners.append(callback)
+    return callback
+
+
+def _reset_name_cache():
+    """Open the rewritten files on next use.
+
+    The old mappings are not closed: another thread may still be reading
+    them, and each is released once nothing references it.
+    """
+    global _name_index, _name_list, _alias_index
+    with _index_lock:
+        _name_index = None
+        _name_list = None
+        _alias_index = None
+        listeners = list(_index_listeners)
+    for callback in listeners:
+        callback()
+
+
+def get_name_index() -> NameIndex:
+    """Return the process-wide memory-mapped university name index."""
+    global _name_index
+    with _index_lock:
+        if _name_index is None:
+            if not ROR_INDEX_PATH.exists():
+                raise RuntimeError("ROR university names not downloaded yet.")
+            _name_index = NameIndex(ROR_INDEX_PATH)
+        return _name_index
+
+
+def load_university_names() -> tuple[str, ...]:
+    """Return the sorted university names, decoded once per process.
+
+    The same tuple is shared by every caller, so it is immutable.
+    """
+    global _name_list
+    index = get_name_index()
+    with _index_lock:
+        if _name_list is None:
+            _name_list = tuple(index)
+        return _name_list
+
+
+def lookup_university_alias(alias: str) -> list[str]:
+    """Return the ROR display names an alias or acronym refers to."""
+    global _alias_index
+    with _index_lock:
+        if _alias_index is None:
+            if not ROR_ALIAS_INDEX_PATH.exists():
+                return []
+            _alias_index = NameIndex(ROR_ALIAS_INDEX_PATH)
+        index = _alias_index
+    prefix = alias + ALIAS_SEPARATOR
+    return [index[i][len(prefix) :] for i in index.prefix_range(prefix)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the local ROR data.")
+    parser.add_argument("source", nargs="?", help="ROR dump URL or local zip/JSON file")
+    parser.add_argument(
+        "--force", action="store_true", help="re-apply even if version matches"
+    )
+    args = parser.parse_args()
+    refresh_ror_data(args.source, status_cb=print, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+
+def summarize_record(record: dict):
+    """Return (ror_id, status, display name, aliases) for a ROR v2 record."""
+    display = None
+    aliases = []
+    for name_entry in record.get("names", []):
+        types = name_entry.get("types", [])
+        if display is None and "ror_display" in types:
+            display = name_entry["value"]
+        elif "alias" in types or "acronym" in types or "label" in types:
+            aliases.append(name_entry["value"])
+    aliases = sorted({alias for alias in aliases if alias != display})
+    return record.get("id"), record.get("status", "active"), display, aliases
+
+
+def _digest(status, display, aliases) -> str:
+    payload = json.dumps([status, display, aliases], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class RorStore:
+    """Versioned per-record copy of the ROR dataset.
+
+    Keeping one row per ROR id lets a newer dump be applied as a diff: only
+    records whose names or status changed are rewritten, and records missing
+    from the new dump are dropped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                ror_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                display TEXT NOT NULL,
+                aliases TEXT NOT NULL,
+                digest TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def version(self):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def apply_dump(self, records, version: str) -> dict:
+        """Diff a full dump against the store and apply the changes.
+
+        Returns counts of added, changed, withdrawn and removed records.
+        """
+        stats = {"added": 0, "changed": 0, "withdrawn": 0, "removed": 0}
+        known = dict(self.conn.execute("SELECT ror_id, digest FROM records"))
+        seen = set()
+
+        with self.conn:
+            for record in records:
+                ror_id, status, display, aliases = summarize_record(record)
+                if not ror_id or display is None:
+                    continue
+                seen.add(ror_id)
+                digest = _digest(status, display, aliases)
+                previous = known.get(ror_id)
+                if previous == digest:
+                    continue
+                if previous is None:
+                    stats["added"] += 1
+                elif status != "active":
+                    stats["withdrawn"] += 1
+                else:
+                    stats["changed"] += 1
+                self.conn.execute(
+                    """
+                    INSERT INTO records (ror_id, status, display, aliases, digest)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(ror_id) DO UPDATE SET
+                        status = excluded.status,
+                        display = excluded.display,
+                        aliases = excluded.aliases,
+                        digest = excluded.digest
+                    """,
+                    (ror_id, status, display, json.dumps(aliases), digest),
+                )
+
+            removed = [ror_id for ror_id in known if ror_id not in seen]
+            self.conn.executemany(
+                "DELETE FROM records WHERE ror_id = ?",
+                ((ror_id,) for ror_id in removed),
+            )
+            stats["removed"] = len(removed)
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (version,),
+            )
+        return stats
+
+    def display_names(self):
+        for (display,) in self.conn.execute(
+            "SELECT display FROM records WHERE status = 'active'"
+        ):
+            yield display
+
+    def display_records(self):
+        yield from self.conn.execute(
+            "SELECT ror_id, display FROM records WHERE status = 'active'"
+        )
+
+    def alias_pairs(self):
+        for display, aliases in self.conn.execute(
+            "SELECT display, aliases FROM records WHERE status = 'active'"
+        ):
+            for alias in json.loads(aliases):
+                yield alias, display
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Columns the server's ``q`` filter matches against with ``LIKE %q%``.
+SEARCH_COLUMNS = ("name", "email", "university", "country")
+
+# SQLite's LIKE is case-insensitive for ASCII letters only; mirror that exactly
+# so locally filtered results match what the server would have returned.
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _fold(value) -> str:
+    if value is None:
+        return ""
+    return str(value).translate(_ASCII_LOWER)
+
+
+def _has_like_wildcards(query: str) -> bool:
+    return "%" in query or "_" in query
+
+
+class SearchCache:
+    """LRU cache of ``GET /people/`` results.
+
+    Entries are keyed by query, filters and page. A narrowing query (one that
+    contains a cached query as a substring) is answered locally when the
+    cached first page was complete, i.e. held every matching row.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl: float = 15.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query, filters, offset, limit):
+        return (_fold(query), tuple(filters), offset, limit)
+
+    def get(self, query: str, filters: tuple, offset: int, limit: int):
+        """Return cached rows for the search, or None if the server is needed."""
+        now = time.monotonic()
+        key = self._key(query, filters, offset, limit)
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return list(entry["rows"])
+
+            if offset != 0 or _has_like_wildcards(query):
+                return None
+
+            needle = _fold(query)
+            superset = self._find_superset(needle, tuple(filters))
+            if superset is None:
+                return None
+
+        rows = [row for row in superset if self._matches(row, needle)]
+        return rows[:limit]
+
+    def put(self, query: str, filters: tuple, offset: int, limit: int, rows: list):
+        key = self._key(query, filters, offset, limit)
+        entry = {
+            "query": _fold(query),
+            "filters": tuple(filters),
+            "offset": offset,
+            "complete": offset == 0 and len(rows) < limit,
+            "rows": list(rows),
+            "stored_at": time.monotonic(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _find_superset(self, needle: str, filters: tuple):
+        best = None
+        for key in reversed(self._entries):
+            entry = self._entries[key]
+            if not entry["complete"] or entry["filters"] != filters:
+                continue
+            if _has_like_wildcards(entry["query"]) or entry["query"] not in needle:
+                continue
+            # The longest cached query is the tightest superset to scan.
+            if best is None or len(entry["query"]) > len(best["query"]):
+                best = entry
+        if best is None:
+            return None
+        return best["rows"]
+
+    @staticmethod
+    def _matches(row: dict, needle: str) -> bool:
+        if not needle:
+            return True
+        return any(needle in _fold(row.get(col)) for col in SEARCH_COLUMNS)
+
+    def _evict_expired(self, now: float):
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry["stored_at"] > self.ttl
+        ]
+        for key in expired:
+            del self._entries[key]
@@ -1,3 +1,7 @@
+import copy
+import logging
+import threading
+import time
 from pathlib import Path
 
 import tomli
@@ -13,28 +17,137 @@ DEFAULT_SETTINGS = {
     }
 }
 
+# How often (seconds) the cached settings re-check the file's mtime. Between
+# checks every lookup is served from memory without touching the disk.
+MTIME_CHECK_INTERVAL = 2.0
 
-def load_settings() -> dict:
+logger = logging.getLogger(__name__)
+
+
+def _read_settings_file() -> dict:
     if not SETTINGS_FILE.exists():
-        save_settings(DEFAULT_SETTINGS)
-        return DEFAULT_SETTINGS.copy()
+        _write_settings_file(DEFAULT_SETTINGS)
+        return copy.deepcopy(DEFAULT_SETTINGS)
 
     with open(SETTINGS_FILE, "rb") as f:
         loaded = tomli.load(f)
-    settings = DEFAULT_SETTINGS.copy()
-    settings.update(loaded)
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    settings.update({k: v for k, v in loaded.items() if k != "server"})
     settings["server"].update(loaded.get("server", {}))
     return settings
 
 
-def save_settings(settings: dict):
+def _write_settings_file(settings: dict):
     SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
     with open(SETTINGS_FILE, "wb") as f:
         tomli_w.dump(settings, f)
 
 
-def get_server_url() -> str:
-    settings = load_settings()
+def _file_mtime():
+    try:
+        return SETTINGS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class SettingsStore:
+    """In-memory copy of settings.toml, reloaded only when the file changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._settings = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._listeners = []
+
+    def refresh(self) -> bool:
+        """Reload the file if its mtime changed; return True if settings changed."""
+        changed = None
+        with self._lock:
+            now = time.monotonic()
+            if self._settings is None or now - self._checked_at >= MTIME_CHECK_INTERVAL:
+                self._checked_at = now
+                mtime = _file_mtime()
+                if self._settings is None or mtime != self._mtime:
+                    previous = self._settings
+                    self._settings = _read_settings_file()
+                    self._mtime = _file_mtime()
+                    if previous is not None and previous != self._settings:
+                        changed = self._settings
+        if changed is not None:
+            self._notify(changed)
+        return changed is not None
+
+    def get(self) -> dict:
+        self.refresh()
+        with self._lock:
+            return copy.deepcopy(self._settings)
+
+    def save(self, settings: dict):
+        _write_settings_file(settings)
+        with self._lock:
+            # Merge through the normal read path so defaults are filled in.
+            self._settings = _read_settings_file()
+            self._mtime = _file_mtime()
+            self._checked_at = time.monotonic()
+            current = self._settings
+        self._notify(current)
+
+    def invalidate(self):
+        """Force the next lookup to re-read the file."""
+        with self._lock:
+            self._mtime = None
+            self._checked_at = 0.0
+
+    def subscribe(self, callback):
+        """Register ``callback(settings)`` to run whenever the settings change."""
+        with self._lock:
+            self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, settings: dict):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(copy.deepcopy(settings))
+            except Exception:
+                logger.exception("Settings listener %r failed", callback)
+
+
+_store = SettingsStore()
+
+
+def load_settings() -> dict:
+    return _store.get()
+
+
+def save_settings(settings: dict):
+    _store.save(settings)
+
+
+def refresh_settings() -> bool:
+    return _store.refresh()
+
+
+def subscribe(callback):
+    return _store.subscribe(callback)
+
+
+def unsubscribe(callback):
+    _store.unsubscribe(callback)
+
+
+def server_url_from(settings: dict) -> str:
     host = settings["server"]["host"]
     port = settings["server"]["port"]
     return f"http://{host}:{port}"
+
+
+def get_server_url() -> str:
+    return server_url_from(load_settings())
@@ -0,0 +1,155 @@
+"""Consistent copies of the live database.
+
+    python -m server.backup scouting-backup.db
+
+Uses SQLite's online backup API a few pages at a time, pausing between
+steps so requests can write while a large database is copied. A write
+from another connection makes SQLite restart the copy; each restart copies
+four times as many pages per step, and after BACKUP_MAX_RESTARTS the whole
+database is copied in one step. That step holds a read lock throughout,
+which (outside WAL mode) makes writers wait until the copy is done.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .database import DATABASE_FILE, get_connection
+
+BACKUP_STEP_PAGES = int(os.getenv("SCOUTING_BACKUP_STEP_PAGES", "256"))
+BACKUP_STEP_PAUSE = 0.005
+BACKUP_MAX_RESTARTS = 5
+# Snapshot files older than this are left over from failed downloads.
+SNAPSHOT_MAX_AGE = 3600
+SNAPSHOT_CHUNK_BYTES = 1 << 20
+
+
+class _Restarted(Exception):
+    pass
+
+
+def backup_database(target, step_pages: int = BACKUP_STEP_PAGES) -> dict:
+    """Copy the live database to the file ``target``, replacing it.
+
+    Returns the number of pages copied, how often the copy restarted and
+    the time taken.
+    """
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            raise _Restarted
+        last_remaining = remaining
+        # Between steps the source is unlocked; give writers a moment.
+        time.sleep(BACKUP_STEP_PAUSE)
+
+    Path(target).unlink(missing_ok=True)
+    start = time.perf_counter()
+    source = get_connection()
+    destination = sqlite3.connect(target)
+    try:
+        for restarts in range(BACKUP_MAX_RESTARTS + 1):
+            last_remaining = None
+            try:
+                source.backup(destination, pages=step_pages, progress=progress)
+                break
+            except _Restarted:
+                step_pages *= 4
+        else:
+            restarts += 1
+            source.backup(destination)
+        pages = destination.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        destination.close()
+        source.close()
+    return {
+        "pages": pages,
+        "restarts": restarts,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def remove_stale_snapshots(max_age: float = SNAPSHOT_MAX_AGE):
+    """Delete snapshot files whose download never finished cleaning up."""
+    cutoff = time.time() - max_age
+    for path in DATABASE_FILE.parent.glob(".snapshot-*.db"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def snapshot_file() -> Path:
+    """Back up into a new temporary file next to the database.
+
+    The caller deletes the file, e.g. by reading it with ``read_snapshot``.
+    It sits on the database's file system, which has room for a copy where
+    /tmp might not.
+    """
+    remove_stale_snapshots()
+    fd, name = tempfile.mkstemp(
+        prefix=".snapshot-", suffix=".db", dir=DATABASE_FILE.parent
+    )
+    os.close(fd)
+    try:
+        backup_database(name)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return Path(name)
+
+
+def read_snapshot(path: Path):
+    """Yield the file ``path`` in chunks, deleting it once closed.
+
+    The file goes away however the generator ends, including when the
+    client disconnects and the generator is closed early.
+    """
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(SNAPSHOT_CHUNK_BYTES):
+                yield chunk
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Back up the scouting database while the server runs."
+    )
+    parser.add_argument("target", help="File to write the copy to.")
+    parser.add_argument(
+        "--step-pages",
+        type=int,
+        default=BACKUP_STEP_PAGES,
+        help="Pages copied per step (default %(default)s); -1 copies at once.",
+    )
+    args = parser.parse_args(argv)
+
+    target = Path(args.target)
+    if target.resolve() == DATABASE_FILE.resolve():
+        parser.error("the target is the live database")
+    # Write beside the target, then rename, so a failed run leaves no
+    # half-written backup behind.
+    partial = target.with_name(target.name + ".partial")
+    try:
+        result = backup_database(partial, args.step_pages)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, target)
+    print(
+        f"Backed up {DATABASE_FILE} to {target}: {result['pages']} pages in "
+        f"{result['seconds']} s ({result['restarts']} restarts)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,162 @@
+import hashlib
 import os
+import secrets
 import sqlite3
+import time
+import zlib
 from pathlib import Path
 
 import requests
 
+from .metrics import DB_FETCH_SECONDS, DB_STATEMENT_SECONDS, statement_labels
+from .slow_queries import SlowQueryLog
+
 DEFAULT_DB_PATH = Path.home() / "scouting-database" / "app.db"
 DATABASE_FILE = Path(os.getenv("SCOUTING_DB_PATH", str(DEFAULT_DB_PATH)))
 DATABASE_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Set to 0 to skip fetching the country list at startup, e.g. offline or
+# in benchmarks, which seed their own countries.
+PRELOAD_COUNTRIES = os.getenv("SCOUTING_PRELOAD_COUNTRIES", "1") != "0"
+COUNTRY_LIST_URL = "https://restcountries.com/v3.1/all"
+# Opt-in, since both change the database file for every program using it.
+# SCOUTING_WAL=1 switches to write-ahead logging, which stays on until
+# PRAGMA journal_mode = DELETE. SCOUTING_INCREMENTAL_VACUUM=1 gives new
+# databases incremental auto_vacuum; existing ones convert once with
+# ``python -m server.maintenance --convert-vacuum``.
+WAL_MODE = os.getenv("SCOUTING_WAL") == "1"
+INCREMENTAL_VACUUM = os.getenv("SCOUTING_INCREMENTAL_VACUUM") == "1"
+# FTS5 can delete rows from a contentless index by id from SQLite 3.43.
+CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+
+
+# Opt-in: statements slower than this many milliseconds are logged with
+# their query plan (see server/slow_queries.py).
+_slow_query_ms = os.getenv("SCOUTING_SLOW_QUERY_MS")
+slow_query_log = SlowQueryLog(
+    float(_slow_query_ms) if _slow_query_ms else None,
+    Path(
+        os.getenv(
+            "SCOUTING_SLOW_QUERY_LOG", str(DATABASE_FILE.parent / "slow_queries.log")
+        )
+    ),
+)
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records statement and fetch times in the metrics.
+
+    Execution and fetch time add up per statement. When the statement is
+    finished (no rows left, the next statement starts, or the cursor is
+    closed or dropped) a total past the slow-query threshold goes to ``slow_query_log``.
+    """
+
+    _labels = ("", "")
+    _sql = None
+    _parameters = ()
+    _elapsed = 0.0
+
+    def _timed(self, histogram, call, *args):
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            histogram.observe(elapsed, *self._labels)
+            self._elapsed += elapsed
+
+    def _start(self, sql, parameters):
+        self._finish()
+        self._labels = statement_labels(sql) if sql else ("script", "")
+        self._sql = sql
+        self._parameters = parameters
+        self._elapsed = 0.0
+
+    def _finish(self):
+        if (
+            slow_query_log.enabled
+            and self._sql
+            and self._elapsed >= slow_query_log.threshold
+        ):
+            slow_query_log.record(
+                self.connection, self._sql, self._parameters, self._elapsed
+            )
+        self._sql = None
+
+    def _executed(self, result):
+        # Statements without a result set are done once executed.
+        if self.description is None:
+            self._finish()
+        return result
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        return self._executed(
+            self._timed(DB_STATEMENT_SECONDS, super().execute, sql, parameters)
+        )
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql, ())
+        return self._executed(
+            self._timed(
+                DB_STATEMENT_SECONDS, super().executemany, sql, seq_of_parameters
+            )
+        )
+
+    def executescript(self, sql_script):
+        self._start(None, ())
+        return self._timed(DB_STATEMENT_SECONDS, super().executescript, sql_script)
+
+    def fetchone(self):
+        row = self._timed(DB_FETCH_SECONDS, super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        rows = self._timed(DB_FETCH_SECONDS, super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(DB_FETCH_SECONDS, super().fetchall)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() drops its cursor without closing it.
+        try:
+            self._finish()
+        except Exception:
+            pass
+
 
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including ``conn.execute``'s, are timed."""
 
-def get_connection():
-    conn = sqlite3.connect(DATABASE_FILE)
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def get_connection(check_same_thread: bool = True):
+    conn = sqlite3.connect(
+        DATABASE_FILE, factory=TimedConnection, check_same_thread=check_same_thread
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
@@ -20,6 +166,13 @@ def initialize_database():
     conn = get_connection()
     cursor = conn.cursor()
 
+    if INCREMENTAL_VACUUM:
+        # Only takes effect before the first table exists.
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if WAL_MODE:
+        # Readers and the writer no longer block each other.
+        cursor.execute("PRAGMA journal_mode = WAL")
+
     # Universities with ROR identifiers
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS universities (
@@ -64,6 +217,15 @@ def initialize_database():
             FOREIGN KEY (country_id) REFERENCES countries(id)
         )
     """)
+    # Filter and facet columns of GET /people/ and GET /people/facets
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_people_role ON people(role)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_people_subfield ON people(subfield)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_people_country ON people(country_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_people_university ON people(university_id)"
+    )
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS email_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -75,16 +237,322 @@ def initialize_database():
             FOREIGN KEY (person_id) REFERENCES people(id)
         )
     """)
+    # Keyset paging of a person's email history, newest first
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_email_logs_person_time
+        ON email_logs(person_id, timestamp, id)
+    """)
+    create_email_bodies(cursor)
+    create_email_search(cursor)
+    create_change_log(cursor)
+    create_table_versions(cursor)
     conn.commit()
 
-    preload_countries(conn)
+    if PRELOAD_COUNTRIES:
+        preload_countries(conn)
     conn.close()
 
 
+def _column_names(cursor, table):
+    return {row["name"] for row in cursor.execute(f"PRAGMA table_info({table})")}
+
+
+def create_email_bodies(cursor):
+    """Deduplicated, zlib-compressed email bodies keyed by SHA-256.
+
+    email_logs rows reference their body through body_hash; a body is
+    dropped once no log row references it. Bodies still stored inline in
+    email_logs.body by older versions are moved over here.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS email_bodies (
+            hash BLOB PRIMARY KEY,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        ) WITHOUT ROWID
+    """)
+    if "body_hash" not in _column_names(cursor, "email_logs"):
+        cursor.execute("ALTER TABLE email_logs ADD COLUMN body_hash BLOB")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_email_logs_body_hash
+        ON email_logs(body_hash)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS email_bodies_release
+        AFTER DELETE ON email_logs
+        WHEN OLD.body_hash IS NOT NULL
+        BEGIN
+            DELETE FROM email_bodies
+            WHERE hash = OLD.body_hash
+              AND NOT EXISTS (
+                  SELECT 1 FROM email_logs WHERE body_hash = OLD.body_hash
+              );
+        END
+    """)
+
+    # Walk the table by id, so each batch starts where the last one ended
+    # instead of rescanning the rows already moved.
+    last_id = 0
+    while True:
+        rows = cursor.execute(
+            """
+            SELECT id, body FROM email_logs
+            WHERE id > ? AND body IS NOT NULL
+            ORDER BY id LIMIT 500
+            """,
+            (last_id,),
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            cursor.execute(
+                "UPDATE email_logs SET body = NULL, body_hash = ? WHERE id = ?",
+                (store_email_body(cursor, row["body"]), row["id"]),
+            )
+        last_id = rows[-1]["id"]
+
+
+def store_email_body(cursor, body):
+    """Store ``body`` once and return the hash to put in email_logs.body_hash."""
+    if body is None:
+        return None
+    raw = body.encode("utf-8")
+    digest = hashlib.sha256(raw).digest()
+    cursor.execute(
+        "INSERT OR IGNORE INTO email_bodies (hash, size, data) VALUES (?, ?, ?)",
+        (digest, len(raw), zlib.compress(raw, 6)),
+    )
+    return digest
+
+
+def load_email_body(data):
+    """Decompress an email_bodies.data value (None stays None)."""
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
+
+def create_email_search(cursor):
+    """FTS5 index over email subjects and bodies, one document per log row.
+
+    The index is contentless: it keeps only its token lists, no copy of the
+    text, which lives compressed in email_bodies. Rows are added from Python
+    with the plain text at hand (see insert_email_logs), so email_logs rows
+    written by other programs are not searchable. Where SQLite supports
+    contentless_delete, a trigger drops deleted rows from the index; older
+    versions leave them, and searches skip ids no longer in email_logs.
+    """
+    table = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'email_fts'"
+    ).fetchone()
+    if table and "content=''" not in table["sql"]:
+        # Older versions read the text through triggers and a view, from a
+        # plain-text copy of every body.
+        for trigger in ("insert", "delete", "update_old", "update_new"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS email_fts_{trigger}")
+        cursor.execute("DROP TABLE email_fts")
+        table = None
+    cursor.execute("DROP VIEW IF EXISTS email_documents")
+    cursor.execute("DROP TRIGGER IF EXISTS email_texts_release")
+    cursor.execute("DROP TABLE IF EXISTS email_texts")
+    options = "content='',"
+    if CONTENTLESS_DELETE:
+        options += " contentless_delete=1,"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS email_fts USING fts5(
+            subject, body,
+            {options}
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    # Only for an index created with contentless_delete.
+    if CONTENTLESS_DELETE and (table is None or "contentless_delete" in table["sql"]):
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS email_fts_delete
+            AFTER DELETE ON email_logs
+            BEGIN
+                DELETE FROM email_fts WHERE rowid = OLD.id;
+            END
+        """)
+
+    if table is None:
+        last_id = 0
+        while True:
+            rows = cursor.execute(
+                """
+                SELECT e.id, e.subject, b.data FROM email_logs e
+                LEFT JOIN email_bodies b ON b.hash = e.body_hash
+                WHERE e.id > ?
+                ORDER BY e.id LIMIT 500
+                """,
+                (last_id,),
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                index_email(
+                    cursor, row["id"], row["subject"], load_email_body(row["data"])
+                )
+            last_id = rows[-1]["id"]
+
+
+def index_email(cursor, email_id, subject, body):
+    """Add email_logs row ``email_id`` to the search index."""
+    cursor.execute(
+        "INSERT INTO email_fts (rowid, subject, body) VALUES (?, ?, ?)",
+        (email_id, subject, body),
+    )
+
+
+def insert_email_logs(cursor, person_ids, timestamp, subject, body, thread_id):
+    """Log one email for each of ``person_ids`` and index it for search.
+
+    Returns the new email_logs ids. The caller commits.
+    """
+    body_hash = store_email_body(cursor, body)
+    ids = []
+    for person_id in person_ids:
+        cursor.execute(
+            """
+            INSERT INTO email_logs (person_id, timestamp, subject, body_hash, thread_id)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (person_id, timestamp, subject, body_hash, thread_id),
+        )
+        index_email(cursor, cursor.lastrowid, subject, body)
+        ids.append(cursor.lastrowid)
+    return ids
+
+
+def create_change_log(cursor):
+    """Row versions on people plus an append-only change log with tombstones.
+
+    Every insert/update/delete on people appends to people_changes, whose
+    autoincrement key is the monotonically increasing change version.
+    """
+    if "version" not in _column_names(cursor, "people"):
+        cursor.execute(
+            "ALTER TABLE people ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+        )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS people_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_id INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_people_changes_person
+        ON people_changes (person_id)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS people_changes_insert
+        AFTER INSERT ON people
+        BEGIN
+            INSERT INTO people_changes (person_id, op) VALUES (NEW.id, 'upsert');
+            UPDATE people SET version = last_insert_rowid() WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS people_changes_update
+        AFTER UPDATE OF name, email, university_id, country_id,
+                        subfield, subfield_name, role, notes ON people
+        BEGIN
+            INSERT INTO people_changes (person_id, op) VALUES (NEW.id, 'upsert');
+            UPDATE people SET version = last_insert_rowid() WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS people_changes_delete
+        AFTER DELETE ON people
+        BEGIN
+            INSERT INTO people_changes (person_id, op) VALUES (OLD.id, 'delete');
+        END
+    """)
+
+    # Databases created before the change log existed: give every existing
+    # row an initial version so a sync from zero sees them.
+    cursor.execute("SELECT 1 FROM people_changes LIMIT 1")
+    if cursor.fetchone() is None:
+        cursor.execute(
+            "INSERT INTO people_changes (person_id, op) "
+            "SELECT id, 'upsert' FROM people ORDER BY id"
+        )
+        cursor.execute("""
+            UPDATE people SET version = (
+                SELECT MAX(version) FROM people_changes c
+                WHERE c.person_id = people.id
+            )
+        """)
+
+
+# Tables whose changes invalidate cached list responses (ETag/Last-Modified).
+VERSIONED_TABLES = (
+    "people",
+    "universities",
+    "university_aliases",
+    "countries",
+    "email_logs",
+)
+
+
+def create_table_versions(cursor):
+    """Per-table change counters, bumped by triggers on every write.
+
+    The '_instance' row holds a random value fixed at creation so that a
+    restored or replaced database never reuses another file's validators.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+        )
+    """)
+    cursor.execute(
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('_instance', ?)",
+        (secrets.randbits(31),),
+    )
+    for table in VERSIONED_TABLES:
+        cursor.execute(
+            "INSERT OR IGNORE INTO table_versions (name) VALUES (?)", (table,)
+        )
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{op.lower()}
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE table_versions
+                    SET version = version + 1,
+                        updated_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+                    WHERE name = '{table}';
+                END
+            """)
+
+
+def table_versions(conn, tables) -> tuple[str, str]:
+    """Return (ETag, ISO last-modified time) covering ``tables``."""
+    names = ("_instance",) + tuple(tables)
+    placeholders = ", ".join("?" * len(names))
+    rows = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute(
+            f"SELECT name, version, updated_at FROM table_versions "
+            f"WHERE name IN ({placeholders})",
+            names,
+        )
+    }
+    etag = "-".join(str(rows.get(name, (0, ""))[0]) for name in names)
+    last_modified = max(rows.get(name, (0, ""))[1] for name in tables)
+    return f'W/"{etag}"', last_modified
+
+
 def preload_countries(conn):
     cursor = conn.cursor()
     try:
-        resp = requests.get("https://restcountries.com/v3.1/all")
+        resp = requests.get(COUNTRY_LIST_URL, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         for item in data:
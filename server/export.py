@@ -0,0 +1,235 @@
+"""Columnar exports of the catalog as Arrow IPC streams or Parquet files.
+
+    python -m server.export exports/ --format parquet
+
+Tables are read EXPORT_BATCH_ROWS rows at a time by id, one short query
+per batch, and written a batch at a time (one Parquet row group each). So
+memory use does not grow with the catalog, and no read lock is held while
+a slow client downloads: writers only wait for a batch, not the export.
+Rows changed during an export may appear in their old or new state. Needs
+the optional ``pyarrow`` package.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from .database import get_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional; only the export needs it.
+    pa = pq = None
+
+PYARROW_AVAILABLE = pa is not None
+EXPORT_BATCH_ROWS = 50_000
+
+# Format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Table -> (query, id column, column names and Arrow types). The id comes
+# first in each query, which is paged by it. Timestamps are exported as
+# the ISO strings clients sent.
+EXPORT_TABLES = {
+    "people": (
+        """
+        SELECT p.id, p.name, p.email, p.university_id, u.name,
+               p.country_id, c.name, p.subfield, p.subfield_name, p.role, p.notes
+        FROM people p
+        JOIN universities u ON p.university_id = u.id
+        JOIN countries c ON p.country_id = c.id
+        """,
+        "p.id",
+        (
+            ("id", "int64"),
+            ("name", "string"),
+            ("email", "string"),
+            ("university_id", "int64"),
+            ("university", "string"),
+            ("country_id", "int64"),
+            ("country", "string"),
+            ("subfield", "string"),
+            ("subfield_name", "string"),
+            ("role", "string"),
+            ("notes", "string"),
+        ),
+    ),
+    "universities": (
+        "SELECT id, name, ror_id FROM universities",
+        "id",
+        (("id", "int64"), ("name", "string"), ("ror_id", "string")),
+    ),
+    "university_aliases": (
+        "SELECT id, alias, university_id FROM university_aliases",
+        "id",
+        (("id", "int64"), ("alias", "string"), ("university_id", "int64")),
+    ),
+    "countries": (
+        "SELECT id, name, code FROM countries",
+        "id",
+        (("id", "int64"), ("name", "string"), ("code", "string")),
+    ),
+    "email_logs": (
+        """
+        SELECT e.id, e.person_id, e.timestamp, e.subject, e.thread_id, b.size
+        FROM email_logs e LEFT JOIN email_bodies b ON b.hash = e.body_hash
+        """,
+        "e.id",
+        (
+            ("id", "int64"),
+            ("person_id", "int64"),
+            ("timestamp", "string"),
+            ("subject", "string"),
+            ("thread_id", "string"),
+            ("body_size", "int64"),
+        ),
+    ),
+}
+
+
+class _Chunks:
+    """Write-only file object holding a writer's output until drained."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def table_schema(table: str):
+    return pa.schema(
+        [(name, getattr(pa, kind)()) for name, kind in EXPORT_TABLES[table][2]]
+    )
+
+
+def batch_query(table: str) -> str:
+    """The rows of ``table`` after id ? in id order, at most ? of them."""
+    query, key = EXPORT_TABLES[table][:2]
+    return f"{query} WHERE {key} > ? ORDER BY {key} LIMIT ?"
+
+
+def _batches(conn, table: str, schema, batch_rows: int):
+    query = batch_query(table)
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    last_id = -(2**63)  # Below any rowid
+    # Each batch is a finished statement, so the database is unlocked
+    # while the batch is written out.
+    while rows := cursor.execute(query, (last_id, batch_rows)).fetchall():
+        last_id = rows[-1][0]
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(zip(*rows), schema)
+            ],
+            schema=schema,
+        )
+
+
+def _writer(fmt: str, sink, schema):
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_stream(sink, schema)
+
+
+def stream_table(table: str, fmt: str, batch_rows: int = EXPORT_BATCH_ROWS):
+    """Yield the export of ``table`` in chunks, one batch at a time.
+
+    The connection may be used from different threads as a streaming
+    response advances the generator, but never from two at once.
+    """
+    conn = get_connection(check_same_thread=False)
+    try:
+        schema = table_schema(table)
+        sink = _Chunks()
+        writer = _writer(fmt, sink, schema)
+        try:
+            for batch in _batches(conn, table, schema, batch_rows):
+                writer.write_batch(batch)
+                if chunk := sink.drain():
+                    yield chunk
+        finally:
+            # Also when the client goes away or a batch fails, so the
+            # writer's buffers are released with the connection.
+            writer.close()
+        yield sink.drain()
+    finally:
+        conn.close()
+
+
+def export_table(table: str, path, fmt: str, batch_rows=EXPORT_BATCH_ROWS) -> int:
+    """Write ``table`` to the file ``path``; returns the number of rows.
+
+    A failed export deletes the file rather than leave a truncated one.
+    """
+    conn = get_connection()
+    try:
+        schema = table_schema(table)
+        rows = 0
+        with _writer(fmt, str(path), schema) as writer:
+            for batch in _batches(conn, table, schema, batch_rows):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export the scouting catalog as Arrow or Parquet files."
+    )
+    parser.add_argument("directory", help="Directory to write one file per table.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="parquet")
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=EXPORT_TABLES,
+        help="Export just this table (repeatable; default all).",
+    )
+    parser.add_argument("--batch-rows", type=int, default=EXPORT_BATCH_ROWS)
+    args = parser.parse_args(argv)
+    if not PYARROW_AVAILABLE:
+        parser.error("pyarrow is not installed (pip install pyarrow)")
+
+    directory = Path(args.directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    extension = EXPORT_FORMATS[args.format][0]
+    for table in args.table or EXPORT_TABLES:
+        path = directory / f"{table}.{extension}"
+        start = time.perf_counter()
+        rows = export_table(table, path, args.format, args.batch_rows)
+        print(f"{table}: {rows} rows to {path} in {time.perf_counter() - start:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
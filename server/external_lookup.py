@@ -1,33 +1,50 @@
+import time
+
 import requests
 
+from .metrics import EXTERNAL_LOOKUP_SECONDS, EXTERNAL_LOOKUPS
+
+
+def _record(service: str, start: float, outcome: str):
+    EXTERNAL_LOOKUP_SECONDS.observe(time.perf_counter() - start, service)
+    EXTERNAL_LOOKUPS.inc(service, outcome)
+
 
 def lookup_country_by_name(name: str) -> tuple[str, str] | None:
     """Lookup ISO country info using REST Countries API."""
+    start = time.perf_counter()
     try:
         response = requests.get(f"https://restcountries.com/v3.1/name/{name}")
         response.raise_for_status()
         data = response.json()
         if not data:
+            _record("restcountries", start, "not_found")
             return None
         match = data[0]
+        _record("restcountries", start, "found")
         return match["name"]["common"], match["cca2"]
     except Exception:
+        _record("restcountries", start, "error")
         return None
 
 
 def lookup_ror_for_university(query: str) -> tuple[str, str, list[str]] | None:
     """Lookup ROR info for a university by name or alias."""
+    start = time.perf_counter()
     try:
         url = f"https://api.ror.org/organizations?query={query}"
         response = requests.get(url)
         response.raise_for_status()
         items = response.json().get("items", [])
         if not items:
+            _record("ror", start, "not_found")
             return None
         item = items[0]
         name = item["name"]
         ror_id = item["id"]
         aliases = item.get("aliases", [])
+        _record("ror", start, "found")
         return name, ror_id, aliases
     except Exception:
+        _record("ror", start, "error")
         return None
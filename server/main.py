@@ -1,41 +1,304 @@
+import asyncio
 import csv
 import io
+import json
+import os
+import re
 import sqlite3
-from typing import List, Optional
+import unicodedata
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional, Union
 
-from fastapi import FastAPI, HTTPException
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 
-from .database import get_connection, initialize_database
+from . import queries
+from .backup import read_snapshot, snapshot_file
+from .compression import CompressionMiddleware
+from .database import (
+    get_connection,
+    initialize_database,
+    insert_email_logs,
+    load_email_body,
+    slow_query_log,
+    table_versions,
+)
+from .export import (
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    PYARROW_AVAILABLE,
+    stream_table,
+)
 from .external_lookup import lookup_country_by_name, lookup_ror_for_university
+from .maintenance import TASKS, ActivityMiddleware
+from .maintenance import scheduler as maintenance
+from .metrics import (
+    CACHE_REQUESTS,
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    render_metrics,
+)
 from .models import (
     Country,
+    EmailLogDetail,
+    EmailLogEntry,
     EmailLogOut,
+    EmailSearchHit,
     EmailThreadLog,
+    PeopleChanges,
+    PeopleColumns,
+    PeopleFacets,
+    PersonChange,
     PersonCreate,
+    PersonFields,
     PersonOut,
+    UniversitySuggestion,
 )
+from .serialization import (
+    FastJSONResponse,
+    parse_fields,
+    people_columnar,
+    people_from_tuples,
+)
+from .university_index import suggester
+
+SSE_KEEPALIVE_SECONDS = 15.0
+EMAIL_PAGE_MAX = 500
+SNIPPET_WORDS = 12
+_WORD_RE = re.compile(r"\w+")
+
+# Above this many people, ``count=estimate`` samples text searches instead
+# of scanning every row.
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("SCOUTING_COUNT_ESTIMATE_ROWS", "50000"))
+COUNT_SAMPLE_ROWS = 5000
+
+# The /admin/ endpoints expose query text and whole-database snapshots and
+# start maintenance work; they answer 404 unless this is set to 1.
+ADMIN_ENDPOINTS = os.getenv("SCOUTING_ADMIN_ENDPOINTS") == "1"
 
-app = FastAPI()
+# Tables whose contents appear in GET /people/ responses.
+PEOPLE_LIST_TABLES = ("people", "universities", "countries")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    maintenance.start()
+    suggester.start_ror_loader()
+    yield
+    await run_in_threadpool(maintenance.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+app.add_middleware(ActivityMiddleware, scheduler=maintenance)
+app.add_middleware(MetricsMiddleware)
 initialize_database()
 
 
-@app.get("/people/{person_id}/emails/", response_model=List[EmailLogOut])
-def get_person_emails(person_id: int):
+def _conditional(conn, request: Request, tables) -> tuple[dict, bool]:
+    """Validators for a list response built from ``tables``.
+
+    Returns the ETag/Last-Modified headers and whether the request's
+    If-None-Match / If-Modified-Since show the client copy is still current.
+    """
+    etag, updated_at = table_versions(conn, tables)
+    last_modified = datetime.strptime(updated_at, "%Y-%m-%dT%H:%M:%SZ").replace(
+        tzinfo=timezone.utc
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    # updated_at has one-second resolution, so until its second is over a
+    # later change could carry the same time (RFC 9110, 8.8.2.2). Only the
+    # ETag validates responses from that second.
+    dated = last_modified < datetime.now(timezone.utc).replace(microsecond=0)
+    if dated:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    not_modified = False
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        not_modified = etag in candidates or "*" in candidates
+    elif if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            since = None
+        if since is not None and dated:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            not_modified = last_modified <= since
+    else:
+        return headers, False
+    CACHE_REQUESTS.inc("http_conditional", "hit" if not_modified else "miss")
+    return headers, not_modified
+
+
+@app.get(
+    "/people/{person_id}/emails/",
+    response_model=List[EmailLogOut],
+    response_model_exclude_unset=True,
+)
+def get_person_emails(
+    person_id: int,
+    response: Response,
+    limit: int = 50,
+    before: Optional[int] = None,
+    summary: bool = False,
+):
+    """A page of a person's emails, newest first.
+
+    Pass the X-Next-Cursor header of a page as ``before`` to get the next
+    one; the header is absent on the last page. ``summary=true`` leaves out
+    the bodies, which GET /emails/{id} returns one at a time. A ``before``
+    that is not one of the person's emails (e.g. it was deleted) is a 400.
+    """
+    limit = max(1, min(limit, EMAIL_PAGE_MAX))
+    query, params = queries.person_emails(person_id, limit + 1, before, summary)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    if before is not None:
+        cursor.execute(
+            "SELECT 1 FROM email_logs WHERE id = ? AND person_id = ?",
+            (before, person_id),
+        )
+        if not cursor.fetchone():
+            conn.close()
+            raise HTTPException(status_code=400, detail="Unknown cursor.")
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    emails = [dict(row) for row in rows]
+    if not summary:
+        for email in emails:
+            email["body"] = load_email_body(email["body"])
+    return emails
+
+
+def _fts_query(text: str) -> str:
+    """Free text to an FTS5 query: every word must match, ``word*`` is a prefix."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _fold(text: str) -> str:
+    """Lower case without diacritics, as the search index compares words."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _snippet(text: str, q: str, words: int = SNIPPET_WORDS) -> str:
+    """Up to ``words`` words of ``text`` around its first match of ``q``.
+
+    Matching words are wrapped in [ ]. Without an exact match, words that
+    start with a query word count, which approximates the index's stemming
+    (``merge`` marks "merged").
+    """
+    terms = [
+        (_fold(word.strip('*"')), word.endswith("*"))
+        for word in q.split()
+        if word.strip('*"')
+    ]
+    tokens = list(_WORD_RE.finditer(text or ""))
+    folded = [_fold(token.group()) for token in tokens]
+    hits = {
+        i
+        for i, word in enumerate(folded)
+        if any(
+            word == term or prefix and word.startswith(term) for term, prefix in terms
+        )
+    }
+    if not hits:
+        hits = {
+            i
+            for i, word in enumerate(folded)
+            if any(word.startswith(term) for term, _ in terms)
+        }
+    if not hits:
+        return ""
+    start = max(0, min(min(hits) - 3, len(tokens) - words))
+    end = min(len(tokens), start + words)
+    parts = []
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(text[position : token.start()])
+        parts.append(f"[{token.group()}]" if i in hits else token.group())
+        position = token.end()
+    return (
+        ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(tokens) else "")
+    )
+
+
+@app.get("/emails/search", response_model=List[EmailSearchHit])
+def search_emails(q: str, limit: int = 20):
+    """Emails whose subject or body matches ``q``, best match first.
+
+    An email logged for several people is one hit listing all of them.
+    """
+    limit = max(1, min(limit, 200))
+    match = _fts_query(q)
+    if not match:
+        return []
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(*queries.search_emails(match, limit))
+    hits = [dict(row, people=json.loads(row["people"])) for row in cursor.fetchall()]
+
+    # The index keeps no text, so snippets come from the stored emails;
+    # only inflate the bodies of the hits actually returned.
+    if hits:
+        cursor.execute(*queries.email_texts([hit["id"] for hit in hits]))
+        texts = {row["id"]: row for row in cursor.fetchall()}
+        for hit in hits:
+            row = texts[hit["id"]]
+            hit["snippet"] = _snippet(load_email_body(row["body"]), q) or _snippet(
+                row["subject"], q
+            )
+    conn.close()
+    return hits
+
+
+@app.get("/emails/{email_id}", response_model=EmailLogDetail)
+def get_email(email_id: int):
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
         """
-        SELECT id, timestamp, subject, body, thread_id
-        FROM email_logs
-        WHERE person_id = ?
-        ORDER BY timestamp DESC
+        SELECT e.id, e.person_id, e.timestamp, e.subject, b.data AS body,
+               e.thread_id
+        FROM email_logs e
+        LEFT JOIN email_bodies b ON b.hash = e.body_hash
+        WHERE e.id = ?
         """,
-        (person_id,),
+        (email_id,),
     )
-    rows = cursor.fetchall()
+    row = cursor.fetchone()
     conn.close()
-    return [dict(row) for row in rows]
+    if not row:
+        raise HTTPException(status_code=404, detail="Email not found.")
+    return dict(row, body=load_email_body(row["body"]))
 
 
 @app.post("/emails/")
@@ -55,14 +318,9 @@ def ingest_email_thread(log: EmailThreadLog):
         conn.close()
         raise HTTPException(status_code=404, detail="No matching people found.")
 
-    for person_id in matched:
-        cursor.execute(
-            """
-            INSERT INTO email_logs (person_id, timestamp, subject, body, thread_id)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (person_id, log.timestamp, log.subject, log.body, log.thread_id),
-        )
+    insert_email_logs(
+        cursor, matched, log.timestamp, log.subject, log.body, log.thread_id
+    )
 
     conn.commit()
     conn.close()
@@ -76,24 +334,19 @@ def log_email(entry: EmailLogEntry):
 
     matched_ids = []
     for email in entry.participants:
-        cursor.execute("SELECT id FROM people WHERE email = ?", (email,))
+        cursor.execute(queries.PERSON_BY_EMAIL, (email,))
         row = cursor.fetchone()
         if row:
             matched_ids.append(row["id"])
 
-    for person_id in matched_ids:
-        cursor.execute(
-            """
-            INSERT INTO email_logs (person_id, timestamp, subject, body, thread_id)
-            VALUES (?, ?, ?, ?, ?)
-        """,
-            (
-                person_id,
-                entry.timestamp,
-                entry.subject,
-                entry.body,
-                entry.thread_id,
-            ),
+    if matched_ids:
+        insert_email_logs(
+            cursor,
+            matched_ids,
+            entry.timestamp,
+            entry.subject,
+            entry.body,
+            entry.thread_id,
         )
 
     conn.commit()
@@ -106,14 +359,7 @@ def log_email(entry: EmailLogEntry):
 def export_people_csv():
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT p.name, p.email, u.name AS university, c.name AS country,
-               p.subfield, p.subfield_name, p.role, p.notes
-        FROM people p
-        JOIN universities u ON p.university_id = u.id
-        JOIN countries c ON p.country_id = c.id
-        ORDER BY p.id DESC
-    """)
+    cursor.execute(queries.EXPORT_PEOPLE)
     rows = cursor.fetchall()
     conn.close()
 
@@ -155,90 +401,203 @@ def export_people_csv():
     )
 
 
+@app.get("/export/{table}")
+def export_table(table: str, export_format: str = Query("parquet", alias="format")):
+    """Stream a whole table as Parquet or an Arrow IPC stream.
+
+    ``table`` is one of people (with university and country names),
+    universities, university_aliases, countries or email_logs (metadata
+    and body size, without bodies).
+    """
+    if not PYARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=501, detail="Export needs pyarrow on the server."
+        )
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Unknown table.")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be arrow or parquet.")
+    extension, media_type = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        stream_table(table, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={table}.{extension}"},
+    )
+
+
 @app.get("/ping")
 async def ping():
     return {"status": "ok"}
 
 
-@app.post("/people/", response_model=PersonOut)
-def create_person(person: PersonCreate):
-    conn = get_connection()
-    cursor = conn.cursor()
+def _admin_enabled():
+    if not ADMIN_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
 
-    # --- Resolve university ---
-    cursor.execute("SELECT id FROM universities WHERE name = ?", (person.university,))
-    row = cursor.fetchone()
+
+# Route options shared by the /admin/ endpoints.
+ADMIN = {
+    "dependencies": [Depends(_admin_enabled)],
+    "include_in_schema": ADMIN_ENDPOINTS,
+}
+
+
+@app.get("/admin/slow_queries", **ADMIN)
+def list_slow_queries(limit: int = 20, order: str = "total"):
+    """Slowest statements since startup, by total or max duration.
+
+    Empty unless SCOUTING_SLOW_QUERY_MS is set; every occurrence is also in
+    the rotating log file at ``log_path``.
+    """
+    if order not in ("total", "max"):
+        raise HTTPException(status_code=400, detail="order must be total or max.")
+    threshold = slow_query_log.threshold
+    return {
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": None if threshold is None else threshold * 1000,
+        "log_path": str(slow_query_log.path),
+        "queries": slow_query_log.worst(max(1, min(limit, 500)), order),
+    }
+
+
+@app.delete("/admin/slow_queries", **ADMIN)
+def reset_slow_queries():
+    slow_query_log.reset()
+    return {"status": "ok"}
+
+
+@app.get("/admin/snapshot", **ADMIN)
+def download_snapshot():
+    """A consistent copy of the whole database as an SQLite file.
+
+    Taken with the online backup API while the server keeps serving writes.
+    """
+    path = snapshot_file()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return StreamingResponse(
+        read_snapshot(path),
+        media_type="application/vnd.sqlite3",
+        headers={
+            "Content-Disposition": f'attachment; filename="scouting-{stamp}.db"',
+            "Content-Length": str(path.stat().st_size),
+        },
+    )
+
+
+@app.get("/admin/maintenance", **ADMIN)
+def maintenance_status():
+    """Maintenance schedule and the most recent runs, newest first."""
+    return {
+        "enabled": maintenance.enabled,
+        "interval_seconds": maintenance.interval,
+        "idle_seconds": maintenance.idle_seconds,
+        "running": maintenance.running,
+        "tasks": list(TASKS),
+        "runs": list(reversed(maintenance.history)),
+    }
+
+
+@app.post("/admin/maintenance", **ADMIN)
+def run_maintenance(task: Optional[List[str]] = Query(None)):
+    """Run maintenance now: all tasks, or those named by ``task``."""
+    unknown = set(task or ()) - set(TASKS)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown tasks: {', '.join(sorted(unknown))}"
+        )
+    record = maintenance.run("manual", task)
+    if record is None:
+        raise HTTPException(status_code=409, detail="Maintenance already running.")
+    return record
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request, SQL, lookup and cache metrics in Prometheus text format."""
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _resolve_university(conn, name: str) -> int:
+    """Id of the university called ``name``, by name, alias or ROR lookup.
+
+    Universities found through ROR are added. Closes ``conn`` and raises
+    HTTPException when the name cannot be resolved.
+    """
+    cursor = conn.cursor()
+    row = cursor.execute(queries.UNIVERSITY_BY_NAME, (name,)).fetchone()
     if row:
-        university_id = row["id"]
-    else:
+        return row["id"]
+    row = cursor.execute(queries.UNIVERSITY_BY_ALIAS, (name,)).fetchone()
+    if row:
+        return row["university_id"]
+
+    result = lookup_ror_for_university(name)
+    if not result:
+        conn.close()
+        raise HTTPException(status_code=404, detail="University not found via ROR.")
+    canonical_name, ror_id, aliases = result
+    try:
         cursor.execute(
-            "SELECT university_id FROM university_aliases WHERE alias = ?",
-            (person.university,),
+            "INSERT INTO universities (name, ror_id) VALUES (?, ?)",
+            (canonical_name, ror_id),
         )
-        alias_row = cursor.fetchone()
-        if alias_row:
-            university_id = alias_row["university_id"]
-        else:
-            result = lookup_ror_for_university(person.university)
-            if not result:
-                conn.close()
-                raise HTTPException(
-                    status_code=404, detail="University not found via ROR."
-                )
+        university_id = cursor.lastrowid
+    except sqlite3.IntegrityError:
+        # Already exists — get its ID
+        row = cursor.execute(queries.UNIVERSITY_BY_ROR_ID, (ror_id,)).fetchone()
+        if not row:
+            conn.close()
+            raise HTTPException(
+                status_code=400,
+                detail="Failed to retrieve existing university after conflict.",
+            )
+        university_id = row["id"]
+    conn.commit()
+    return university_id
 
-            canonical_name, ror_id, aliases = result
 
-        try:
-            cursor.execute(
-                "INSERT INTO universities (name, ror_id) VALUES (?, ?)",
-                (canonical_name, ror_id),
-            )
-            university_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Already exists — get its ID
-            cursor.execute("SELECT id FROM universities WHERE ror_id = ?", (ror_id,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to retrieve existing university after conflict.",
-                )
-            university_id = row["id"]
-
-            conn.commit()
-
-    # --- Resolve country ---
-    cursor.execute("SELECT id FROM countries WHERE name = ?", (person.country,))
-    row = cursor.fetchone()
+def _resolve_country(conn, name: str) -> int:
+    """Id of the country called ``name``, added via ISO lookup if unknown.
+
+    Closes ``conn`` and raises HTTPException when the name cannot be resolved.
+    """
+    cursor = conn.cursor()
+    row = cursor.execute(queries.COUNTRY_BY_NAME, (name,)).fetchone()
     if row:
-        country_id = row["id"]
-    else:
-        result = lookup_country_by_name(person.country)
-        if not result:
+        return row["id"]
+
+    result = lookup_country_by_name(name)
+    if not result:
+        conn.close()
+        raise HTTPException(status_code=404, detail="Country not found via ISO lookup.")
+    canonical_name, code = result
+    try:
+        cursor.execute(
+            "INSERT INTO countries (name, code) VALUES (?, ?)",
+            (canonical_name, code),
+        )
+        country_id = cursor.lastrowid
+    except sqlite3.IntegrityError:
+        # Already exists — get ID by code
+        row = cursor.execute(queries.COUNTRY_BY_CODE, (code,)).fetchone()
+        if not row:
             conn.close()
             raise HTTPException(
-                status_code=404, detail="Country not found via ISO lookup."
-            )
-        canonical_name, code = result
-        try:
-            cursor.execute(
-                "INSERT INTO countries (name, code) VALUES (?, ?)",
-                (canonical_name, code),
+                status_code=400,
+                detail="Failed to retrieve existing country after conflict.",
             )
-            country_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Already exists — get ID by code
-            cursor.execute("SELECT id FROM countries WHERE code = ?", (code,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to retrieve existing country after conflict.",
-                )
-            country_id = row["id"]
-        conn.commit()
+        country_id = row["id"]
+    conn.commit()
+    return country_id
+
+
+@app.post("/people/", response_model=PersonOut)
+def create_person(person: PersonCreate):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    university_id = _resolve_university(conn, person.university)
+    country_id = _resolve_country(conn, person.country)
 
     # --- Insert person ---
     try:
@@ -267,6 +626,7 @@ def create_person(person: PersonCreate):
         raise HTTPException(status_code=400, detail="Email already exists.")
 
     conn.close()
+    suggester.invalidate()
     return PersonOut(
         id=person_id,
         university_id=university_id,
@@ -290,6 +650,7 @@ def delete_person(person_id: int):
     cursor.execute("DELETE FROM people WHERE id = ?", (person_id,))
     conn.commit()
     conn.close()
+    suggester.invalidate()
 
     return {"status": "success", "message": f"Person {person_id} deleted."}
 
@@ -299,77 +660,8 @@ def update_person(person_id: int, person: PersonCreate):
     conn = get_connection()
     cursor = conn.cursor()
 
-    # --- Resolve university ---
-    cursor.execute("SELECT id FROM universities WHERE name = ?", (person.university,))
-    row = cursor.fetchone()
-    if row:
-        university_id = row["id"]
-    else:
-        cursor.execute(
-            "SELECT university_id FROM university_aliases WHERE alias = ?",
-            (person.university,),
-        )
-        alias_row = cursor.fetchone()
-        if alias_row:
-            university_id = alias_row["university_id"]
-        else:
-            result = lookup_ror_for_university(person.university)
-            if not result:
-                conn.close()
-                raise HTTPException(
-                    status_code=404, detail="University not found via ROR."
-                )
-            canonical_name, ror_id, aliases = result
-        try:
-            cursor.execute(
-                "INSERT INTO universities (name, ror_id) VALUES (?, ?)",
-                (canonical_name, ror_id),
-            )
-            university_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Already exists — get its ID
-            cursor.execute("SELECT id FROM universities WHERE ror_id = ?", (ror_id,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to retrieve existing university after conflict.",
-                )
-            university_id = row["id"]
-            conn.commit()
-
-    # --- Resolve country ---
-    cursor.execute("SELECT id FROM countries WHERE name = ?", (person.country,))
-    row = cursor.fetchone()
-    if row:
-        country_id = row["id"]
-    else:
-        result = lookup_country_by_name(person.country)
-        if not result:
-            conn.close()
-            raise HTTPException(
-                status_code=404, detail="Country not found via ISO lookup."
-            )
-        canonical_name, code = result
-        try:
-            cursor.execute(
-                "INSERT INTO countries (name, code) VALUES (?, ?)",
-                (canonical_name, code),
-            )
-            country_id = cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # Already exists — get ID by code
-            cursor.execute("SELECT id FROM countries WHERE code = ?", (code,))
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to retrieve existing country after conflict.",
-                )
-            country_id = row["id"]
-        conn.commit()
+    university_id = _resolve_university(conn, person.university)
+    country_id = _resolve_country(conn, person.country)
 
     # --- Ensure person exists ---
     cursor.execute("SELECT * FROM people WHERE id = ?", (person_id,))
@@ -410,6 +702,7 @@ def update_person(person_id: int, person: PersonCreate):
         raise HTTPException(status_code=400, detail="Email already exists.")
 
     conn.close()
+    suggester.invalidate()
     return PersonOut(
         id=person_id,
         university_id=university_id,
@@ -418,92 +711,295 @@ def update_person(person_id: int, person: PersonCreate):
     )
 
 
-@app.get("/people/", response_model=List[PersonOut])
+@app.get(
+    "/people/",
+    response_model=Union[List[PersonOut], List[PersonFields], PeopleColumns],
+)
 def list_people(
+    request: Request,
     role: Optional[str] = None,
     country: Optional[str] = None,
     subfield: Optional[str] = None,
     q: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
+    fields: Optional[str] = None,
+    response_format: str = Query("rows", alias="format"),
+    count: str = "none",
 ):
+    """List people.
+
+    ``fields`` is a comma-separated projection of PersonOut fields.
+    ``format=columns`` returns ``{"columns": [...], "rows": [[...], ...]}``
+    instead of one object per person.
+
+    ``count=exact`` or ``count=estimate`` also reports how many people
+    match, in the X-Total-Count header (and ``total`` in the columnar body).
+    X-Total-Count-Kind says whether the number is exact or estimated.
+
+    The rows are serialized directly, without validation; the response
+    model only documents the three shapes (PersonOut objects, PersonFields
+    objects for ``fields=``, PeopleColumns for ``format=columns``), which the
+    SELECT list and the schema's NOT NULL columns guarantee.
+    """
+    if response_format not in ("rows", "columns"):
+        raise HTTPException(status_code=400, detail="format must be rows or columns.")
+    if count not in ("none", "exact", "estimate"):
+        raise HTTPException(
+            status_code=400, detail="count must be none, exact or estimate."
+        )
+    try:
+        keys = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     conn = get_connection()
+    headers, not_modified = _conditional(conn, request, PEOPLE_LIST_TABLES)
+    if not_modified:
+        conn.close()
+        return Response(status_code=304, headers=headers)
     cursor = conn.cursor()
+    # Plain tuples: rows go straight to JSON without per-row models.
+    cursor.row_factory = None
 
-    query = """
-        SELECT p.*, u.name AS university, c.name AS country
-        FROM people p
-        JOIN universities u ON p.university_id = u.id
-        JOIN countries c ON p.country_id = c.id
-    """
-    filters = []
-    params = []
-
-    # Optional filters
-    if role:
-        filters.append("p.role = ?")
-        params.append(role)
-    if country:
-        filters.append("c.name = ?")
-        params.append(country)
-    if subfield:
-        filters.append("p.subfield = ?")
-        params.append(subfield)
-    if q:
-        filters.append("""
-            (
-                p.name LIKE ?
-                OR p.email LIKE ?
-                OR u.name LIKE ?
-                OR c.name LIKE ?
+    query, params = queries.list_people(keys, role, country, subfield, q, limit, offset)
+
+    cursor.execute(query, tuple(params))
+    rows = cursor.fetchall()
+
+    total = None
+    if count != "none":
+        if rows and len(rows) < limit or offset == 0 and not rows and limit > 0:
+            # A short page ends the result set, so the total is known.
+            total, estimated = offset + len(rows), False
+        else:
+            total, estimated = _count_people(
+                cursor, role, country, subfield, q, exact=count == "exact"
             )
-        """)
-        params.extend([f"%{q}%"] * 4)
+            total = max(total, offset + len(rows))
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Kind"] = "estimate" if estimated else "exact"
+    conn.close()
 
-    if filters:
-        query += " WHERE " + " AND ".join(filters)
+    if response_format == "columns":
+        content = people_columnar(rows, keys)
+        if total is not None:
+            content["total"] = total
+            content["total_estimated"] = estimated
+        return FastJSONResponse(content, headers=headers)
+    return FastJSONResponse(people_from_tuples(rows, keys), headers=headers)
 
-    query += " ORDER BY p.id DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
 
-    cursor.execute(query, tuple(params))
+def _count_people(cursor, role, country, subfield, q, exact: bool):
+    """Number of people matching the filters, and whether it is estimated.
+
+    Equality filters are index-backed and always counted exactly. A text
+    search has to scan every row, so on large tables (and unless ``exact``)
+    its selectivity is measured on about COUNT_SAMPLE_ROWS people spread
+    evenly over the id range and scaled up to the exact count of the other
+    filters.
+    """
+    max_id = cursor.execute(queries.MAX_PERSON_ID).fetchone()[0] or 0
+    if exact or not q or max_id <= COUNT_ESTIMATE_THRESHOLD:
+        cursor.execute(*queries.count_people(role, country, subfield, q))
+        return cursor.fetchone()[0], False
+
+    cursor.execute(*queries.count_people(role, country, subfield, None))
+    (base,) = cursor.fetchone()
+
+    stride = max(1, max_id // COUNT_SAMPLE_ROWS)
+    cursor.execute(*queries.sample_people(role, country, subfield, q, stride, max_id))
+    sampled, hits = cursor.fetchone()
+    if not sampled:
+        return 0, True
+    return round(base * hits / sampled), True
+
+
+@app.get("/people/facets", response_model=PeopleFacets)
+def people_facets(
+    request: Request,
+    response: Response,
+    role: Optional[str] = None,
+    country: Optional[str] = None,
+    subfield: Optional[str] = None,
+    q: Optional[str] = None,
+    facet_limit: int = 50,
+):
+    """Counts per role, subfield, country and university for a search.
+
+    Takes the same filters as GET /people/. Each facet ignores its own
+    filter, so the counts show what selecting another value would give;
+    ``total`` applies them all. Everything comes from one grouped query.
+    """
+    facet_limit = max(1, min(facet_limit, 1000))
+    conn = get_connection()
+    headers, not_modified = _conditional(conn, request, PEOPLE_LIST_TABLES)
+    if not_modified:
+        conn.close()
+        return Response(status_code=304, headers=headers)
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(*queries.people_facets(role, country, subfield, q, facet_limit))
     rows = cursor.fetchall()
     conn.close()
 
-    return [
-        PersonOut(
-            id=row["id"],
-            name=row["name"],
-            email=row["email"],
-            university=row["university"],
-            country=row["country"],
-            university_id=row["university_id"],
-            country_id=row["country_id"],
-            subfield=row["subfield"],
-            subfield_name=row["subfield_name"],
-            role=row["role"],
-            notes=row["notes"],
+    facets = {"total": 0, **{facet: [] for facet in queries.PEOPLE_FACETS}}
+    for facet, value, count in rows:
+        if facet == "total":
+            facets["total"] = count
+        else:
+            facets[facet].append({"value": value, "count": count})
+    response.headers.update(headers)
+    return facets
+
+
+def _person_from_row(row) -> PersonOut:
+    return PersonOut(
+        id=row["id"],
+        name=row["name"],
+        email=row["email"],
+        university=row["university"],
+        country=row["country"],
+        university_id=row["university_id"],
+        country_id=row["country_id"],
+        subfield=row["subfield"],
+        subfield_name=row["subfield_name"],
+        role=row["role"],
+        notes=row["notes"],
+    )
+
+
+def _fetch_people_changes(since: int, limit: int) -> dict:
+    """Latest change per person after ``since``, oldest first."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT person_id, MAX(version) AS version
+        FROM people_changes
+        WHERE version > ?
+        GROUP BY person_id
+        ORDER BY version
+        LIMIT ?
+        """,
+        (since, limit + 1),
+    )
+    latest = cursor.fetchall()
+    has_more = len(latest) > limit
+    latest = latest[:limit]
+
+    people = {}
+    if latest:
+        ids = [row["person_id"] for row in latest]
+        placeholders = ", ".join("?" * len(ids))
+        cursor.execute(
+            f"""
+            SELECT p.*, u.name AS university, c.name AS country
+            FROM people p
+            JOIN universities u ON p.university_id = u.id
+            JOIN countries c ON p.country_id = c.id
+            WHERE p.id IN ({placeholders})
+            """,
+            ids,
+        )
+        people = {row["id"]: _person_from_row(row) for row in cursor.fetchall()}
+    conn.close()
+
+    changes = []
+    for row in latest:
+        person = people.get(row["person_id"])
+        changes.append(
+            {
+                "version": row["version"],
+                "op": "upsert" if person else "delete",
+                "id": row["person_id"],
+                "person": person,
+            }
         )
-        for row in rows
-    ]
+    return {
+        "version": changes[-1]["version"] if changes else since,
+        "has_more": has_more,
+        "changes": changes,
+    }
+
+
+@app.get("/people/changes", response_model=PeopleChanges)
+def list_people_changes(since: int = 0, limit: int = 1000):
+    limit = max(1, min(limit, 10000))
+    return _fetch_people_changes(since, limit)
+
+
+@app.get("/people/changes/stream")
+async def stream_people_changes(
+    request: Request, since: int = 0, poll_interval: float = 1.0
+):
+    """Server-sent events carrying the same changes as GET /people/changes."""
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    poll_interval = max(0.2, min(poll_interval, 30.0))
+
+    async def events():
+        version = since
+        idle = 0.0
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            page = await run_in_threadpool(_fetch_people_changes, version, 500)
+            for change in page["changes"]:
+                data = PersonChange(**change).model_dump_json()
+                yield f"id: {change['version']}\nevent: change\ndata: {data}\n\n"
+            version = page["version"]
+            if page["has_more"]:
+                continue
+            if page["changes"]:
+                idle = 0.0
+            elif idle >= SSE_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/universities/")
-def list_universities(limit: int = 1000):
+def list_universities(request: Request, response: Response, limit: int = 1000):
     conn = get_connection()
+    headers, not_modified = _conditional(conn, request, ("universities",))
+    if not_modified:
+        conn.close()
+        return Response(status_code=304, headers=headers)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM universities ORDER BY name LIMIT ?", (limit,))
     rows = cursor.fetchall()
     conn.close()
+    response.headers.update(headers)
     return [dict(row) for row in rows]
 
 
+@app.get("/universities/suggest", response_model=List[UniversitySuggestion])
+def suggest_universities(q: str = "", limit: int = 10):
+    limit = max(1, min(limit, 100))
+    if not q.strip():
+        return []
+    conn = get_connection()
+    try:
+        return suggester.suggest(conn, q, limit)
+    finally:
+        conn.close()
+
+
 @app.post("/universities/aliases/")
 def create_university_alias(alias: str, canonical_name: str):
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT id FROM universities WHERE name = ?", (canonical_name,))
+    cursor.execute(queries.UNIVERSITY_BY_NAME, (canonical_name,))
     row = cursor.fetchone()
     if not row:
         conn.close()
@@ -520,14 +1016,20 @@ def create_university_alias(alias: str, canonical_name: str):
         raise HTTPException(status_code=400, detail="Alias already exists.")
 
     conn.close()
+    suggester.invalidate()
     return {"alias": alias, "university_id": row["id"]}
 
 
 @app.get("/countries/", response_model=List[Country])
-def list_countries():
+def list_countries(request: Request, response: Response):
     conn = get_connection()
+    headers, not_modified = _conditional(conn, request, ("countries",))
+    if not_modified:
+        conn.close()
+        return Response(status_code=304, headers=headers)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM countries ORDER BY name")
     rows = cursor.fetchall()
     conn.close()
+    response.headers.update(headers)
     return [dict(row) for row in rows]
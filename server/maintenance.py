@@ -0,0 +1,265 @@
+"""Scheduled upkeep of the live database.
+
+    python -m server.maintenance              # run every task once
+    python -m server.maintenance --convert-vacuum
+
+The scheduler never rewrites the whole file: the vacuum task only runs
+an incremental vacuum, and skips databases without auto_vacuum. Those
+convert once with ``--convert-vacuum``, a full VACUUM best run with the
+server stopped, as it locks the database for its duration and needs free
+disk space for a second copy.
+"""
+
+import argparse
+import collections
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .database import get_connection
+from .metrics import Counter, Histogram
+
+# Pages of FTS segments merged per step, and at most this many steps a run.
+FTS_MERGE_PAGES = 500
+FTS_MERGE_MAX_STEPS = 20
+# Rows PRAGMA optimize may sample per index when refreshing statistics.
+ANALYSIS_LIMIT = 1000
+
+_POLL_SECONDS = 5.0
+
+MAINTENANCE_SECONDS = Histogram(
+    "maintenance_task_duration_seconds",
+    "Time taken by database maintenance tasks.",
+    ("task",),
+)
+MAINTENANCE_RUNS = Counter(
+    "maintenance_tasks_total",
+    "Database maintenance task runs by outcome (ok or error).",
+    ("task", "outcome"),
+)
+
+
+def merge_email_search(conn) -> dict:
+    """Merge the email search index's segments a bounded amount."""
+    steps = 0
+    while steps < FTS_MERGE_MAX_STEPS:
+        before = conn.total_changes
+        conn.execute(
+            "INSERT INTO email_fts (email_fts, rank) VALUES ('merge', ?)",
+            (FTS_MERGE_PAGES,),
+        )
+        conn.commit()
+        steps += 1
+        # The documented "nothing left" signal: total_changes grows by less
+        # than two when a merge did no work (FTS5 docs, "The 'merge' Command").
+        if conn.total_changes - before < 2:
+            break
+    return {"steps": steps}
+
+
+def vacuum(conn) -> dict:
+    """Return free pages to the file system with an incremental vacuum."""
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if auto_vacuum != 2:  # incremental
+        return {"mode": "skipped", "free_pages": free, "pages": pages}
+    conn.execute("PRAGMA incremental_vacuum").fetchall()
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {"mode": "incremental", "pages_released": free - after}
+
+
+def convert_vacuum(conn) -> dict:
+    """Switch to incremental auto_vacuum, which takes a full VACUUM."""
+    before = conn.execute("PRAGMA page_count").fetchone()[0]
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    after = conn.execute("PRAGMA page_count").fetchone()[0]
+    return {"pages_before": before, "pages_after": after}
+
+
+def optimize(conn) -> dict:
+    """Refresh planner statistics that have gone stale."""
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    if sqlite3.sqlite_version_info >= (3, 46, 0):
+        # 0x10000: consider every table, not only those this connection used.
+        conn.execute("PRAGMA optimize = 0x10002").fetchall()
+        return {"statement": "optimize"}
+    # Older versions only look at tables queried on this fresh connection,
+    # i.e. none; a sampled ANALYZE is the bounded equivalent.
+    conn.execute("ANALYZE")
+    conn.commit()
+    return {"statement": "analyze"}
+
+
+def checkpoint(conn) -> dict:
+    """Copy the write-ahead log into the database and truncate it."""
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+        return {"mode": "skipped"}
+    busy, log, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return {"busy": bool(busy), "log_pages": log, "checkpointed_pages": checkpointed}
+
+
+# Run in this order, so the checkpoint also covers the other tasks' writes.
+TASKS = {
+    "fts_merge": merge_email_search,
+    "vacuum": vacuum,
+    "optimize": optimize,
+    "wal_checkpoint": checkpoint,
+}
+
+
+class MaintenanceScheduler:
+    """Runs TASKS in a background thread every ``interval`` seconds.
+
+    A due run waits until no request has started for ``idle_seconds``, but
+    no longer than another full interval. The last ``history_size`` runs
+    are kept for GET /admin/maintenance. An interval of 0 disables the
+    schedule; ``run()`` still works.
+    """
+
+    def __init__(self, interval: float, idle_seconds: float, history_size=50):
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.history = collections.deque(maxlen=history_size)
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_run = time.monotonic()
+        self._last_request = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def touch(self):
+        self._last_request = time.monotonic()
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="db-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(_POLL_SECONDS):
+            now = time.monotonic()
+            since_run = now - self._last_run
+            idle = now - self._last_request >= self.idle_seconds
+            if since_run >= self.interval and (idle or since_run >= 2 * self.interval):
+                self.run("idle" if idle else "overdue")
+
+    def run(self, trigger: str = "manual", tasks=None) -> dict | None:
+        """Run ``tasks`` (default all) now; None if a run is in progress."""
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        try:
+            record = {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "trigger": trigger,
+                "tasks": [],
+            }
+            start = time.perf_counter()
+            conn = get_connection()
+            try:
+                for name in tasks or TASKS:
+                    record["tasks"].append(self._run_task(conn, name))
+            finally:
+                conn.close()
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            self.history.append(record)
+            self._last_run = time.monotonic()
+            return record
+        finally:
+            self._run_lock.release()
+
+    @staticmethod
+    def _run_task(conn, name: str) -> dict:
+        entry = {"task": name, "status": "ok"}
+        start = time.perf_counter()
+        try:
+            with MAINTENANCE_SECONDS.time(name):
+                entry["result"] = TASKS[name](conn)
+        except Exception as e:
+            # One failing task (e.g. a locked database) must not stop the rest.
+            conn.rollback()
+            entry["status"] = "error"
+            entry["error"] = f"{type(e).__name__}: {e}"
+        MAINTENANCE_RUNS.inc(name, entry["status"])
+        entry["seconds"] = round(time.perf_counter() - start, 3)
+        return entry
+
+
+class ActivityMiddleware:
+    """Tells ``scheduler`` when requests arrive, so it can wait for quiet."""
+
+    def __init__(self, app, scheduler: MaintenanceScheduler):
+        self.app = app
+        self.scheduler = scheduler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.scheduler.touch()
+        await self.app(scope, receive, send)
+
+
+# Hourly by default, after 30 quiet seconds; an interval of 0 turns it off.
+scheduler = MaintenanceScheduler(
+    interval=float(os.getenv("SCOUTING_MAINTENANCE_INTERVAL", "3600")),
+    idle_seconds=float(os.getenv("SCOUTING_MAINTENANCE_IDLE", "30")),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the scouting database's maintenance tasks once."
+    )
+    parser.add_argument(
+        "--task",
+        action="append",
+        choices=TASKS,
+        help="Run just this task (repeatable; default all).",
+    )
+    parser.add_argument(
+        "--convert-vacuum",
+        action="store_true",
+        help="Enable incremental auto_vacuum with a one-off full VACUUM.",
+    )
+    args = parser.parse_args(argv)
+
+    conn = get_connection()
+    try:
+        if args.convert_vacuum:
+            result = convert_vacuum(conn)
+            print(
+                f"Converted to incremental vacuum: {result['pages_before']} "
+                f"pages before, {result['pages_after']} after."
+            )
+            return 0
+        for name in args.task or TASKS:
+            entry = MaintenanceScheduler._run_task(conn, name)
+            print(
+                f"{name}: {entry['status']} {entry.get('result', entry.get('error'))}"
+            )
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
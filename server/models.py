@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, EmailStr
 
@@ -20,6 +20,44 @@ class PersonOut(PersonCreate):
     country_id: int
 
 
+class PersonFields(BaseModel):
+    """PersonOut reduced to the ``fields=`` requested from GET /people/."""
+
+    name: Optional[str] = None
+    email: Optional[str] = None
+    university: Optional[str] = None
+    country: Optional[str] = None
+    subfield: Optional[str] = None
+    subfield_name: Optional[str] = None
+    role: Optional[str] = None
+    notes: Optional[str] = None
+    id: Optional[int] = None
+    university_id: Optional[int] = None
+    country_id: Optional[int] = None
+
+
+class PeopleColumns(BaseModel):
+    """GET /people/?format=columns: column names once, then one array per row."""
+
+    columns: List[str]
+    rows: List[List[Union[int, str, None]]]
+    total: Optional[int] = None  # With count=exact or count=estimate
+    total_estimated: Optional[bool] = None
+
+
+class PersonChange(BaseModel):
+    version: int
+    op: str  # 'upsert' or 'delete'
+    id: int
+    person: Optional[PersonOut] = None  # None for deletes
+
+
+class PeopleChanges(BaseModel):
+    version: int  # Version to pass as `since` on the next call
+    has_more: bool
+    changes: List[PersonChange]
+
+
 class University(BaseModel):
     id: int
     name: str
@@ -46,9 +84,59 @@ class EmailThreadLog(BaseModel):
     participants: List[str]
 
 
+class EmailLogEntry(BaseModel):
+    timestamp: str  # ISO format
+    subject: Optional[str] = None
+    body: str
+    thread_id: Optional[str] = None
+    participants: List[str]
+
+
 class EmailLogOut(BaseModel):
     id: int
     timestamp: str
     subject: Optional[str]
-    body: str
+    body: Optional[str] = None  # Left out of summary listings
     thread_id: Optional[str]
+
+
+class EmailLogDetail(EmailLogOut):
+    person_id: int
+
+
+class EmailParticipant(BaseModel):
+    id: int
+    name: str
+    email: str
+
+
+class EmailSearchHit(BaseModel):
+    id: int  # One of the matching email_logs rows; see GET /emails/{id}
+    timestamp: str
+    subject: Optional[str]
+    thread_id: Optional[str]
+    snippet: str  # Matched terms wrapped in [ ]
+    rank: float  # bm25; lower is better
+    people: List[EmailParticipant]
+
+
+class UniversitySuggestion(BaseModel):
+    name: str  # Canonical or ROR display name
+    matched: str  # The name or alias the query matched
+    source: str  # 'university', 'alias' or 'ror'
+    university_id: Optional[int] = None
+    ror_id: Optional[str] = None
+    people: int = 0  # Number of people referencing this university
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PeopleFacets(BaseModel):
+    total: int  # People matching every filter
+    role: List[FacetCount]
+    subfield: List[FacetCount]
+    country: List[FacetCount]
+    university: List[FacetCount]
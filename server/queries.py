@@ -0,0 +1,228 @@
+"""SQL for the server's hot paths.
+
+Endpoints build their statements here so the plans SQLite picks for them
+can be checked in one place: ``python -m benchmarks.query_plans`` runs
+EXPLAIN QUERY PLAN for each of them on a synthetic catalog and fails when
+a lookup stops using its index.
+"""
+
+from .serialization import select_list
+
+# Name -> id lookups used when creating or updating people.
+UNIVERSITY_BY_NAME = "SELECT id FROM universities WHERE name = ?"
+UNIVERSITY_BY_ALIAS = "SELECT university_id FROM university_aliases WHERE alias = ?"
+UNIVERSITY_BY_ROR_ID = "SELECT id FROM universities WHERE ror_id = ?"
+COUNTRY_BY_NAME = "SELECT id FROM countries WHERE name = ?"
+COUNTRY_BY_CODE = "SELECT id FROM countries WHERE code = ?"
+PERSON_BY_EMAIL = "SELECT id FROM people WHERE email = ?"
+
+EXPORT_PEOPLE = """
+    SELECT p.name, p.email, u.name AS university, c.name AS country,
+           p.subfield, p.subfield_name, p.role, p.notes
+    FROM people p
+    JOIN universities u ON p.university_id = u.id
+    JOIN countries c ON p.country_id = c.id
+    ORDER BY p.id DESC
+"""
+
+
+def people_filters(role, country, subfield, q, skip=None) -> tuple[list, list]:
+    """WHERE clauses and parameters shared by the people list endpoints.
+
+    Expects ``people p`` joined to ``universities u`` and ``countries c``
+    where the clauses reference them. ``skip`` names a filter to leave out.
+    """
+    filters = []
+    params = []
+    if role and skip != "role":
+        filters.append("p.role = ?")
+        params.append(role)
+    if country and skip != "country":
+        filters.append("c.name = ?")
+        params.append(country)
+    if subfield and skip != "subfield":
+        filters.append("p.subfield = ?")
+        params.append(subfield)
+    if q:
+        filters.append("""
+            (
+                p.name LIKE ?
+                OR p.email LIKE ?
+                OR u.name LIKE ?
+                OR c.name LIKE ?
+            )
+        """)
+        params.extend([f"%{q}%"] * 4)
+    return filters, params
+
+
+def list_people(keys, role, country, subfield, q, limit, offset) -> tuple[str, list]:
+    """A page of people with the ``keys`` columns, newest first."""
+    # The foreign keys guarantee a match, so the joins only matter when
+    # their names are selected or filtered on.
+    join_universities = "university" in keys or bool(q)
+    join_countries = "country" in keys or bool(country) or bool(q)
+
+    query = f"""
+        SELECT {select_list(keys)}
+        FROM people p
+    """
+    if join_universities:
+        query += " JOIN universities u ON p.university_id = u.id"
+    if join_countries:
+        query += " JOIN countries c ON p.country_id = c.id"
+    filters, params = people_filters(role, country, subfield, q)
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+
+    query += " ORDER BY p.id DESC LIMIT ? OFFSET ?"
+    params.extend([limit, offset])
+    return query, params
+
+
+def person_emails(person_id, limit, before, summary) -> tuple[str, list]:
+    """Up to ``limit`` of a person's emails older than email ``before``.
+
+    Bodies are joined in unless ``summary``.
+    """
+    query = "SELECT e.id, e.timestamp, e.subject, e.thread_id"
+    if summary:
+        query += " FROM email_logs e"
+    else:
+        query += """, b.data AS body
+            FROM email_logs e LEFT JOIN email_bodies b ON b.hash = e.body_hash
+        """
+    query += " WHERE e.person_id = ?"
+    params = [person_id]
+    if before is not None:
+        query += """
+            AND (e.timestamp, e.id) < (
+                SELECT timestamp, id FROM email_logs WHERE id = ?
+            )
+        """
+        params.append(before)
+    query += " ORDER BY e.timestamp DESC, e.id DESC LIMIT ?"
+    params.append(limit)
+    return query, params
+
+
+def _count(filters, join_universities, join_countries, text=None) -> str:
+    sql = "SELECT COUNT(*)"
+    if text:
+        sql += f", TOTAL({text})"
+    sql += " FROM people p"
+    if join_universities:
+        sql += " JOIN universities u ON p.university_id = u.id"
+    if join_countries:
+        sql += " JOIN countries c ON p.country_id = c.id"
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    return sql
+
+
+MAX_PERSON_ID = "SELECT MAX(id) FROM people"
+
+
+def count_people(role, country, subfield, q) -> tuple[str, list]:
+    """The exact number of people matching the filters."""
+    filters, params = people_filters(role, country, subfield, q)
+    return _count(filters, bool(q), bool(q or country)), params
+
+
+def sample_people(role, country, subfield, q, stride, max_id) -> tuple[str, list]:
+    """Every ``stride``-th id up to ``max_id`` matching the other filters.
+
+    Selects how many of those people there are and how many of them match
+    the text search ``q``, using point lookups instead of a scan.
+    """
+    filters, params = people_filters(role, country, subfield, None)
+    text_filters, text_params = people_filters(None, None, None, q)
+    filters.append("""p.id IN (
+        WITH RECURSIVE sample(id) AS (
+            SELECT ? UNION ALL SELECT id + ? FROM sample WHERE id + ? <= ?
+        )
+        SELECT id FROM sample
+    )""")
+    params.extend([stride // 2 + 1, stride, stride, max_id])
+    return _count(filters, True, True, text=text_filters[0]), text_params + params
+
+
+# Facet name -> grouped column
+PEOPLE_FACETS = {
+    "role": "p.role",
+    "subfield": "p.subfield",
+    "country": "c.name",
+    "university": "u.name",
+}
+
+
+def people_facets(role, country, subfield, q, facet_limit) -> tuple[str, list]:
+    """One grouped query for the total and every facet's top values.
+
+    Rows are (facet, value, count), with facet 'total' first. Each
+    facet ignores its own filter.
+    """
+    source = """
+        FROM people p
+        JOIN universities u ON p.university_id = u.id
+        JOIN countries c ON p.country_id = c.id
+    """
+    filters, params = people_filters(role, country, subfield, q)
+    where = " WHERE " + " AND ".join(filters) if filters else ""
+    branches = [f"SELECT 'total', NULL, COUNT(*) {source}{where}"]
+    for facet, column in PEOPLE_FACETS.items():
+        filters, filter_params = people_filters(role, country, subfield, q, facet)
+        where = " WHERE " + " AND ".join(filters) if filters else ""
+        # Compound SELECTs only allow ORDER BY/LIMIT inside subqueries.
+        branches.append(f"""
+            SELECT * FROM (
+                SELECT '{facet}', {column}, COUNT(*) AS n
+                {source}{where}
+                GROUP BY {column}
+                ORDER BY n DESC, {column}
+                LIMIT ?
+            )
+        """)
+        params.extend(filter_params)
+        params.append(facet_limit)
+    return " UNION ALL ".join(branches), params
+
+
+def search_emails(match, limit) -> tuple[str, list]:
+    """The best ``limit`` emails for the FTS5 query ``match``.
+
+    Ranks in the index first, then folds the per-person copies of a
+    message into one row listing its people as JSON.
+    """
+    query = """
+        WITH hits AS (
+            SELECT rowid AS id, bm25(email_fts, 2.0, 1.0) AS rank
+            FROM email_fts
+            WHERE email_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        )
+        SELECT MIN(e.id) AS id, e.timestamp, e.subject, e.thread_id,
+               MIN(h.rank) AS rank,
+               json_group_array(
+                   json_object('id', p.id, 'name', p.name, 'email', p.email)
+               ) AS people
+        FROM hits h
+        JOIN email_logs e ON e.id = h.id
+        JOIN people p ON p.id = e.person_id
+        GROUP BY e.timestamp, e.subject, e.thread_id, e.body_hash
+        ORDER BY rank
+        LIMIT ?
+    """
+    return query, [match, limit * 10, limit]
+
+
+def email_texts(ids) -> tuple[str, list]:
+    """(id, subject, compressed body) of the emails ``ids``."""
+    query = f"""
+        SELECT e.id, e.subject, b.data AS body
+        FROM email_logs e
+        LEFT JOIN email_bodies b ON b.hash = e.body_hash
+        WHERE e.id IN ({",".join("?" * len(ids))})
+    """
+    return query, list(ids)
@@ -1,42 +1,118 @@
-import json
+"""ROR organizations for the server's university suggestions.
+
+    python -m server.ror_loader            # the release in ROR_URL
+    python -m server.ror_loader dump.zip
+
+The dump is applied to a store next to the database. The server only
+downloads one itself when SCOUTING_ROR_SOURCE names a dump URL or file;
+otherwise it uses what the store already holds.
+"""
+
+import argparse
+import os
+import shutil
+import sys
 from pathlib import Path
 
-import requests
+from client.ror_dump import (
+    ROR_URL,
+    ROR_ZIP_PATTERN,
+    dataset_version,
+    download_with_resume,
+    is_url,
+    open_dump,
+)
+from client.ror_store import RorStore
+
+from .database import DATABASE_FILE
+
+# URL or local path of a dump to apply at startup; empty (the default)
+# skips the download, e.g. in tests and benchmarks.
+ROR_SOURCE = os.getenv("SCOUTING_ROR_SOURCE", "")
+ROR_DATA_DIR = DATABASE_FILE.parent
+ROR_STORE_PATH = ROR_DATA_DIR / "ror_store.db"
+# Left in the working directory by earlier versions.
+_LEGACY_DIR = Path("data")
+_LEGACY_PATHS = (_LEGACY_DIR / "ror_dump.json", _LEGACY_DIR / "ror_version.txt")
+
+
+def _adopt_legacy_store():
+    legacy = _LEGACY_DIR / ROR_STORE_PATH.name
+    if legacy.exists() and not ROR_STORE_PATH.exists():
+        shutil.move(legacy, ROR_STORE_PATH)
 
-ROR_URL = "https://zenodo.org/record/15298417/files/ror-data-v2.0.json?download=1"
-ROR_LOCAL_PATH = Path("data/ror_dump.json")
 
+def current_version() -> str | None:
+    _adopt_legacy_store()
+    if not ROR_STORE_PATH.exists():
+        return None
+    with RorStore(ROR_STORE_PATH) as store:
+        return store.version
 
-def load_university_names() -> list[str]:
-    if not ROR_LOCAL_PATH.exists():
+
+def load_university_records() -> list[tuple[str, str]]:
+    """(ROR id, display name) of every active organization in the store."""
+    _adopt_legacy_store()
+    if not ROR_STORE_PATH.exists():
         raise FileNotFoundError(
-            "ROR dump not found. Make sure `ensure_ror_data()` is called."
+            "ROR store not found. Load it with `python -m server.ror_loader`."
         )
+    with RorStore(ROR_STORE_PATH) as store:
+        return list(store.display_records())
 
-    with open(ROR_LOCAL_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    names = []
-    for record in data:
-        for name_entry in record.get("names", []):
-            if "ror_display" in name_entry.get("types", []):
-                names.append(name_entry["value"])
-                break  # use first preferred name
-    return sorted(set(names))
 
+def ensure_ror_data(source=None):
+    """Apply the dump at ``source`` to the ROR store unless already there.
 
-def ensure_ror_data():
-    ROR_LOCAL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if ROR_LOCAL_PATH.exists():
-        print("[✅] ROR data found.")
+    The dump is parsed one record at a time, so memory use does not depend
+    on its size.
+    """
+    source = ROR_SOURCE if source is None else source
+    if not source:
         return
+    version = dataset_version(source)
+    _adopt_legacy_store()
+
+    with RorStore(ROR_STORE_PATH) as store:
+        if store.version == version:
+            print(f"[✅] ROR data {version} found.")
+            return
+        try:
+            if is_url(source):
+                print(f"[⬇️] Downloading ROR data {version} from Zenodo...")
+                dump_path = ROR_DATA_DIR / ROR_ZIP_PATTERN.format(version=version)
+                download_with_resume(source, dump_path, lambda msg: None)
+            else:
+                print(f"[📁] Loading ROR data {version} from {source}...")
+                dump_path = Path(source)
+            with open_dump(dump_path) as records:
+                stats = store.apply_dump(records, version)
+            if is_url(source):
+                dump_path.unlink()
+            for path in _LEGACY_PATHS:
+                path.unlink(missing_ok=True)
+            print(
+                f"[✅] ROR data {version} saved: {stats['added']} added, "
+                f"{stats['changed']} changed, {stats['removed']} removed."
+            )
+        except Exception as e:
+            print(f"[❌] Failed to load ROR data: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load ROR organizations for the server's suggestions."
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=ROR_SOURCE or ROR_URL,
+        help="ROR dump URL or local zip/JSON file (default %(default)s).",
+    )
+    args = parser.parse_args(argv)
+    ensure_ror_data(args.source)
+    return 0
+
 
-    print("[⬇️] Downloading ROR data from Zenodo...")
-    try:
-        response = requests.get(ROR_URL, timeout=20)
-        response.raise_for_status()
-        with open(ROR_LOCAL_PATH, "wb") as f:
-            f.write(response.content)
-        print("[✅] ROR data downloaded and saved.")
-    except Exception as e:
-        print(f"[❌] Failed to download ROR data: {e}")
+if __name__ == "__main__":
+    sys.exit(main())
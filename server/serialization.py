@@ -0,0 +1,90 @@
+import json
+
+from fastapi.responses import Response
+
+from .metrics import RESPONSE_RENDER_SECONDS
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json produces the same output.
+    orjson = None
+
+# PersonOut's fields, in PersonOut's order, and the SELECT list producing them.
+PERSON_KEYS = (
+    "name",
+    "email",
+    "university",
+    "country",
+    "subfield",
+    "subfield_name",
+    "role",
+    "notes",
+    "id",
+    "university_id",
+    "country_id",
+)
+PERSON_COLUMN_SQL = {
+    "name": "p.name",
+    "email": "p.email",
+    "university": "u.name AS university",
+    "country": "c.name AS country",
+    "subfield": "p.subfield",
+    "subfield_name": "p.subfield_name",
+    "role": "p.role",
+    "notes": "p.notes",
+    "id": "p.id",
+    "university_id": "p.university_id",
+    "country_id": "p.country_id",
+}
+PERSON_COLUMNS = ", ".join(PERSON_COLUMN_SQL[key] for key in PERSON_KEYS)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Validate a comma-separated ``fields=`` projection.
+
+    Returns the requested keys in PersonOut order (all keys if empty).
+    Raises ValueError naming any unknown field.
+    """
+    requested = {field.strip() for field in (fields or "").split(",") if field.strip()}
+    if not requested:
+        return PERSON_KEYS
+    unknown = requested - set(PERSON_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(key for key in PERSON_KEYS if key in requested)
+
+
+def select_list(keys) -> str:
+    return ", ".join(PERSON_COLUMN_SQL[key] for key in keys)
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's response_model validation.
+
+    Only use it for content whose shape is already guaranteed, e.g. rows
+    produced by ``PERSON_COLUMNS`` against the NOT NULL schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        with RESPONSE_RENDER_SECONDS.time("fast_json"):
+            return dumps(content)
+
+
+def people_from_tuples(rows, keys=PERSON_KEYS) -> list[dict]:
+    """Map plain tuples selected with ``select_list(keys)`` to dicts."""
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def people_columnar(rows, keys=PERSON_KEYS) -> dict:
+    """Column names once, then each row as a bare array of values."""
+    return {"columns": list(keys), "rows": [list(row) for row in rows]}
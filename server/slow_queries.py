@@ -0,0 +1,120 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+# Statements EXPLAIN QUERY PLAN can describe.
+_EXPLAINABLE = {"select", "with", "insert", "update", "delete", "replace"}
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def parameter_shape(parameters) -> list[str]:
+    """Types of the bound parameters; values are never logged."""
+    if isinstance(parameters, dict):
+        return [f"{key}:{type(value).__name__}" for key, value in parameters.items()]
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def explain(conn, sql: str, parameters) -> list[str]:
+    """EXPLAIN QUERY PLAN output as indented lines, or [] if unavailable."""
+    if sql.split(None, 1)[0].lower() not in _EXPLAINABLE:
+        return []
+    try:
+        # A plain cursor, so the EXPLAIN itself is neither timed nor logged.
+        rows = (
+            sqlite3.Cursor(conn)
+            .execute("EXPLAIN QUERY PLAN " + sql, parameters)
+            .fetchall()
+        )
+    except sqlite3.Error:
+        return []
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+class SlowQueryLog:
+    """Records statements slower than a threshold.
+
+    Each slow statement is appended as a JSON line to a rotating log file
+    and aggregated in memory per distinct SQL text for ``worst()``.
+    A threshold of None disables the log entirely.
+    """
+
+    def __init__(self, threshold_ms, path, max_bytes=5_000_000, backups=3):
+        self.threshold = None if threshold_ms is None else threshold_ms / 1000.0
+        self.path = path
+        self.max_entries = 500
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._logger = None
+        if self.threshold is not None:
+            self._logger = logging.getLogger("scouting.slow_queries")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+            )
+            self._logger.addHandler(handler)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    def record(self, conn, sql: str, parameters, seconds: float):
+        key = _normalize(sql)
+        shape = parameter_shape(parameters)
+        with self._lock:
+            stats = self._stats.get(key)
+            known = stats is not None
+        # Plans rarely change between runs of one statement; explain once.
+        plan = stats["plan"] if known else explain(conn, sql, parameters)
+
+        entry = {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "duration_ms": round(seconds * 1000, 3),
+            "sql": key,
+            "parameters": shape,
+            "plan": plan,
+        }
+        self._logger.info(json.dumps(entry))
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_entries:
+                    return
+                stats = self._stats[key] = {
+                    "sql": key,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "plan": plan,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += entry["duration_ms"]
+            stats["max_ms"] = max(stats["max_ms"], entry["duration_ms"])
+            stats["last_parameters"] = shape
+            stats["last_seen"] = entry["at"]
+
+    def worst(self, limit: int = 20, order: str = "total") -> list[dict]:
+        key = "max_ms" if order == "max" else "total_ms"
+        with self._lock:
+            stats = [dict(s) for s in self._stats.values()]
+        stats.sort(key=lambda s: s[key], reverse=True)
+        for s in stats:
+            s["mean_ms"] = round(s["total_ms"] / s["count"], 3)
+            s["total_ms"] = round(s["total_ms"], 3)
+        return stats[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
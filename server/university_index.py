@@ -0,0 +1,178 @@
+import bisect
+import re
+import threading
+
+from .metrics import CACHE_REQUESTS
+from .ror_loader import ensure_ror_data, load_university_records
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    return text.casefold()
+
+
+class PrefixIndex:
+    """Sorted whole-name and word-prefix lookup over ``(key, entry)`` pairs."""
+
+    def __init__(self, pairs):
+        names = []
+        words = []
+        for key, entry in pairs:
+            folded = _fold(key)
+            names.append((folded, entry))
+            for word in set(_TOKEN_RE.findall(folded)):
+                words.append((word, folded, entry))
+        names.sort(key=lambda item: item[0])
+        words.sort(key=lambda item: item[0])
+        self._name_keys = [folded for folded, _ in names]
+        self._name_entries = [entry for _, entry in names]
+        self._word_keys = [word for word, _, _ in words]
+        self._word_items = [(folded, entry) for _, folded, entry in words]
+
+    @staticmethod
+    def _range(keys, prefix):
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def search(self, query: str, max_scan: int):
+        """Yield ``(entry, is_name_prefix)`` for entries matching ``query``."""
+        query = _fold(query.strip())
+        if not query:
+            return
+        lo, hi = self._range(self._name_keys, query)
+        for pos in range(lo, min(hi, lo + max_scan)):
+            yield self._name_entries[pos], True
+
+        words = _TOKEN_RE.findall(query)
+        if not words:
+            return
+        ranges = [self._range(self._word_keys, w) for w in words]
+        anchor = min(range(len(words)), key=lambda k: ranges[k][1] - ranges[k][0])
+        others = words[:anchor] + words[anchor + 1 :]
+        lo, hi = ranges[anchor]
+        for pos in range(lo, min(hi, lo + max_scan)):
+            folded, entry = self._word_items[pos]
+            if all(w in folded for w in others):
+                yield entry, folded.startswith(query)
+
+
+class UniversitySuggester:
+    """In-memory typeahead over known universities, aliases and ROR names.
+
+    The database part (universities, aliases and how many people reference
+    each university) is small and rebuilt lazily after ``invalidate()``; the
+    ROR part is static and loaded in the background by ``start_ror_loader()``.
+    Until it is ready, suggestions come from the database alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._db_index = None
+        self._ror_index = PrefixIndex(())
+        self._ror_thread = None
+
+    def invalidate(self):
+        with self._lock:
+            self._db_index = None
+
+    def _build_db_index(self, conn):
+        rows = conn.execute("""
+            SELECT u.id, u.name, u.ror_id, COUNT(p.id) AS people
+            FROM universities u
+            LEFT JOIN people p ON p.university_id = u.id
+            GROUP BY u.id
+        """).fetchall()
+        universities = {
+            row["id"]: {
+                "name": row["name"],
+                "university_id": row["id"],
+                "ror_id": row["ror_id"],
+                "people": row["people"],
+            }
+            for row in rows
+        }
+        pairs = [
+            (u["name"], dict(u, matched=u["name"], source="university"))
+            for u in universities.values()
+        ]
+        for row in conn.execute("SELECT alias, university_id FROM university_aliases"):
+            university = universities.get(row["university_id"])
+            if university:
+                pairs.append(
+                    (
+                        row["alias"],
+                        dict(university, matched=row["alias"], source="alias"),
+                    )
+                )
+        return PrefixIndex(pairs)
+
+    def load_ror_index(self, source=None):
+        """Bring the ROR store up to date, then swap in an index built from it."""
+        ensure_ror_data(source)
+        try:
+            records = load_university_records()
+        except FileNotFoundError:
+            return
+        index = PrefixIndex(
+            (
+                name,
+                {
+                    "name": name,
+                    "matched": name,
+                    "source": "ror",
+                    "ror_id": ror_id,
+                    "people": 0,
+                },
+            )
+            for ror_id, name in records
+        )
+        with self._lock:
+            self._ror_index = index
+
+    def start_ror_loader(self):
+        if self._ror_thread is None:
+            self._ror_thread = threading.Thread(
+                target=self.load_ror_index, name="ror-loader", daemon=True
+            )
+            self._ror_thread.start()
+
+    def _indexes(self, conn):
+        with self._lock:
+            if self._db_index is None:
+                CACHE_REQUESTS.inc("university_suggester", "miss")
+                self._db_index = self._build_db_index(conn)
+            else:
+                CACHE_REQUESTS.inc("university_suggester", "hit")
+            return self._db_index, self._ror_index
+
+    def suggest(self, conn, query: str, limit: int = 10) -> list[dict]:
+        db_index, ror_index = self._indexes(conn)
+
+        # Known universities: rank by how many people reference them, then
+        # whole-name prefix matches, then shorter names.
+        best = {}
+        for entry, is_prefix in db_index.search(query, max_scan=2000):
+            key = entry["university_id"]
+            rank = (-entry["people"], not is_prefix, len(entry["matched"]))
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, entry)
+        results = [entry for _, entry in sorted(best.values(), key=lambda r: r[0])]
+        results = results[:limit]
+
+        if len(results) < limit:
+            taken = {_fold(entry["name"]) for entry in results}
+            ror_matches = []
+            for entry, is_prefix in ror_index.search(query, max_scan=limit * 20):
+                folded = _fold(entry["name"])
+                if folded in taken:
+                    continue
+                taken.add(folded)
+                ror_matches.append(((not is_prefix, len(entry["name"])), entry))
+            ror_matches.sort(key=lambda r: r[0])
+            results.extend(entry for _, entry in ror_matches[: limit - len(results)])
+        return results
+
+
+suggester = UniversitySuggester()
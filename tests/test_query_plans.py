@@ -0,0 +1,44 @@
+"""The server's hot queries keep using their indexes.
+
+Runs the cases of ``benchmarks.query_plans`` against a small synthetic
+catalog, both before and after ANALYZE. The cases are only built once the
+catalog exists, since importing the server fixes its database path.
+"""
+
+import shutil
+import sqlite3
+
+import pytest
+
+from benchmarks.query_plans import SORTING_CASES, check_plan
+from benchmarks.synthetic import prepare_database
+
+
+@pytest.fixture(scope="session")
+def catalog(tmp_path_factory):
+    # Sets SCOUTING_DB_PATH, so it has to come before importing the server.
+    return prepare_database(50, 2000, 2000, directory=tmp_path_factory.mktemp("plans"))
+
+
+@pytest.fixture(params=["fresh", "analyzed"])
+def conn(request, catalog, tmp_path_factory):
+    path = tmp_path_factory.mktemp(request.param) / catalog.name
+    shutil.copyfile(catalog, path)
+    conn = sqlite3.connect(path)
+    if request.param == "analyzed":
+        conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+
+def test_plans_use_indexes(conn):
+    from benchmarks.query_plans import cases
+    from server.slow_queries import explain
+
+    problems = {}
+    for name, (sql, params, scans, indexes) in cases().items():
+        plan = explain(conn, sql, params)
+        found = check_plan(plan, scans, indexes, name in SORTING_CASES)
+        if found:
+            problems[name] = found + plan
+    assert problems == {}